@@ -1,4 +1,12 @@
-from aes_constants import S_BOX, INV_S_BOX, RCON, Nk, Nb, Nr, mix_matrix, inv_mix_matrix
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from struct import pack_into, unpack_from
+
+from aes_constants import (
+    S_BOX, INV_S_BOX, RCON, Nb, KEY_SIZES, mix_matrix, inv_mix_matrix, galois_multiplication,
+    TE0, TE1, TE2, TE3, TD0, TD1, TD2, TD3
+)
 
 
 def sub_bytes(state):
@@ -19,20 +27,6 @@ def shift_rows(state):
     ]
 
 
-def galois_multiplication(byte_a, byte_b):
-    # Умножение в поле Галуа GF(2^8) используется в MixColumns
-    result = 0
-    for _ in range(8):  # По каждому биту
-        if byte_b & 1:  # Если младший бит b равен 1
-            result ^= byte_a  # XOR byte_a в результат
-        carry = byte_a & 0x80  # Проверка переполнения (старший бит)
-        byte_a <<= 1  # Умножение на x (сдвиг влево)
-        if carry:
-            byte_a ^= 0x1b  # При переполнении применяем модуль (редуцируем по полиному AES)
-        byte_b >>= 1  # Сдвигаем byte_b вправо
-    return result & 0xFF  # Обрезаем до 1 байта (8 бит)
-
-
 def mix_columns(state, mix_matrix):
     # Преобразует каждый столбец состояния, умножая его на матрицу mix_matrix
     mixed = [0] * 16  # Инициализируем выходной список
@@ -53,10 +47,18 @@ def add_round_key(state, round_key):
     return [s_byte ^ k_byte for s_byte, k_byte in zip(state, round_key)]
 
 
+def key_parameters(cipher_key):
+    # (Nk, Nr) по длине ключа: 16, 24 или 32 байта
+    if len(cipher_key) not in KEY_SIZES:
+        raise ValueError("Длина ключа AES должна быть 16, 24 или 32 байта")
+    return KEY_SIZES[len(cipher_key)]
+
+
 def key_expansion(cipher_key):
     key_bytes = list(cipher_key)  # Преобразуем ключ в список байтов
+    Nk, Nr = key_parameters(key_bytes)  # Параметры зависят от длины ключа
 
-    # Начальное расширение: разбиваем ключ на 4 слова
+    # Начальное расширение: разбиваем ключ на Nk слов
     expanded_key = [key_bytes[i * 4:(i + 1) * 4] for i in range(Nk)]
 
     for i in range(Nk, Nb * (Nr + 1)):
@@ -65,6 +67,8 @@ def key_expansion(cipher_key):
             temp = temp[1:] + temp[:1]  # Циклический сдвиг влево
             temp = [S_BOX[b] for b in temp]  # Преобразование через S-Box
             temp[0] ^= RCON[i // Nk]  # XOR с соответствующей Rcon-константой
+        elif Nk > 6 and i % Nk == 4:
+            temp = [S_BOX[b] for b in temp]  # Для AES-256 - дополнительный SubWord
         # Сохраняем новое слово как XOR текущего temp и слова Nk позади
         expanded_key.append([
             expanded_key[i - Nk][j] ^ temp[j] for j in range(4)
@@ -74,13 +78,65 @@ def key_expansion(cipher_key):
     return [byte for word in expanded_key for byte in word]
 
 
-def aes_encrypt_block(block, key):
+def key_expansion_words(cipher_key):
+    # Расширенный ключ в виде 32-битных слов (по 4 слова на раунд) для табличного движка
+    round_keys = key_expansion(cipher_key)
+    return [
+        int.from_bytes(bytes(round_keys[i:i + 4]), "big")
+        for i in range(0, len(round_keys), 4)
+    ]
+
+
+def encrypt_words(s0, s1, s2, s3, round_words):
+    # Табличный раунд AES: каждое слово s0..s3 - это столбец состояния.
+    # SubBytes, ShiftRows и MixColumns объединены в 4 T-таблицы, поэтому
+    # раунд сводится к 16 выборкам из таблиц и XOR над 32-битными словами.
+    te0, te1, te2, te3 = TE0, TE1, TE2, TE3
+    rk = round_words
+
+    s0 ^= rk[0]  # Начальный раунд (AddRoundKey)
+    s1 ^= rk[1]
+    s2 ^= rk[2]
+    s3 ^= rk[3]
+
+    last = len(rk) - 4  # Смещение ключа финального раунда
+    for i in range(4, last, 4):  # Основные раунды
+        t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xFF] ^ te2[(s2 >> 8) & 0xFF] ^ te3[s3 & 0xFF] ^ rk[i]
+        t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xFF] ^ te2[(s3 >> 8) & 0xFF] ^ te3[s0 & 0xFF] ^ rk[i + 1]
+        t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xFF] ^ te2[(s0 >> 8) & 0xFF] ^ te3[s1 & 0xFF] ^ rk[i + 2]
+        t3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xFF] ^ te2[(s1 >> 8) & 0xFF] ^ te3[s2 & 0xFF] ^ rk[i + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+
+    # Финальный раунд без MixColumns: только SubBytes и ShiftRows
+    sb = S_BOX
+    return (
+        ((sb[s0 >> 24] << 24) | (sb[(s1 >> 16) & 0xFF] << 16) | (sb[(s2 >> 8) & 0xFF] << 8) | sb[s3 & 0xFF]) ^ rk[last],
+        ((sb[s1 >> 24] << 24) | (sb[(s2 >> 16) & 0xFF] << 16) | (sb[(s3 >> 8) & 0xFF] << 8) | sb[s0 & 0xFF]) ^ rk[last + 1],
+        ((sb[s2 >> 24] << 24) | (sb[(s3 >> 16) & 0xFF] << 16) | (sb[(s0 >> 8) & 0xFF] << 8) | sb[s1 & 0xFF]) ^ rk[last + 2],
+        ((sb[s3 >> 24] << 24) | (sb[(s0 >> 16) & 0xFF] << 16) | (sb[(s1 >> 8) & 0xFF] << 8) | sb[s2 & 0xFF]) ^ rk[last + 3],
+    )
+
+
+def encrypt_block_ttable(block, round_words):
+    # Шифрует 16-байтовый блок табличным движком по готовому расширенному ключу
+    s0 = int.from_bytes(block[0:4], "big")
+    s1 = int.from_bytes(block[4:8], "big")
+    s2 = int.from_bytes(block[8:12], "big")
+    s3 = int.from_bytes(block[12:16], "big")
+    t0, t1, t2, t3 = encrypt_words(s0, s1, s2, s3, round_words)
+    return ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, "big")
+
+
+def aes_encrypt_block_reference(block, key):
+    # Пошаговая (эталонная) реализация шифрования блока по стандарту FIPS-197
     state = list(block)  # Преобразуем блок в список байтов
     round_keys = key_expansion(key)  # Генерируем все ключи раундов
 
+    rounds = len(round_keys) // 16 - 1  # Nr: 10, 12 или 14
+
     state = add_round_key(state, round_keys[:16])  # Начальный раунд
 
-    for round_num in range(1, 10):  # Основные 9 раундов
+    for round_num in range(1, rounds):  # Основные раунды
         state = sub_bytes(state)
         state = shift_rows(state)
         state = mix_columns(state, mix_matrix)
@@ -89,7 +145,7 @@ def aes_encrypt_block(block, key):
     # Финальный раунд без MixColumns
     state = sub_bytes(state)
     state = shift_rows(state)
-    state = add_round_key(state, round_keys[160:176])
+    state = add_round_key(state, round_keys[rounds * 16:])
     return bytes(state)  # Возвращаем байты
 
 
@@ -107,13 +163,78 @@ def inv_shift_rows(state):
     ]
 
 
-def aes_decrypt_block(block, key):
+def inv_mix_column_word(word):
+    # InvMixColumns для одного столбца-слова. TD-таблицы уже содержат InvSubBytes,
+    # поэтому сначала "отменяем" его прямым S-Box
+    sb = S_BOX
+    return (
+        TD0[sb[word >> 24]] ^ TD1[sb[(word >> 16) & 0xFF]] ^
+        TD2[sb[(word >> 8) & 0xFF]] ^ TD3[sb[word & 0xFF]]
+    )
+
+
+def inv_key_expansion_words(round_words):
+    # Ключи раундов для эквивалентного обратного шифра: порядок раундов обращён,
+    # а ко всем ключам, кроме первого и последнего, один раз применён InvMixColumns
+    rounds = len(round_words) // 4
+    inv_words = []
+    for round_num in range(rounds - 1, -1, -1):
+        words = round_words[round_num * 4:(round_num + 1) * 4]
+        if 0 < round_num < rounds - 1:
+            words = [inv_mix_column_word(word) for word in words]
+        inv_words.extend(words)
+    return inv_words
+
+
+def decrypt_words(s0, s1, s2, s3, inv_round_words):
+    # Табличный раунд расшифрования (структура такая же, как у encrypt_words,
+    # но строки сдвигаются вправо)
+    td0, td1, td2, td3 = TD0, TD1, TD2, TD3
+    rk = inv_round_words
+
+    s0 ^= rk[0]
+    s1 ^= rk[1]
+    s2 ^= rk[2]
+    s3 ^= rk[3]
+
+    last = len(rk) - 4
+    for i in range(4, last, 4):
+        t0 = td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xFF] ^ td2[(s2 >> 8) & 0xFF] ^ td3[s1 & 0xFF] ^ rk[i]
+        t1 = td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xFF] ^ td2[(s3 >> 8) & 0xFF] ^ td3[s2 & 0xFF] ^ rk[i + 1]
+        t2 = td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xFF] ^ td2[(s0 >> 8) & 0xFF] ^ td3[s3 & 0xFF] ^ rk[i + 2]
+        t3 = td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xFF] ^ td2[(s1 >> 8) & 0xFF] ^ td3[s0 & 0xFF] ^ rk[i + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+
+    # Финальный раунд без InvMixColumns
+    isb = INV_S_BOX
+    return (
+        ((isb[s0 >> 24] << 24) | (isb[(s3 >> 16) & 0xFF] << 16) | (isb[(s2 >> 8) & 0xFF] << 8) | isb[s1 & 0xFF]) ^ rk[last],
+        ((isb[s1 >> 24] << 24) | (isb[(s0 >> 16) & 0xFF] << 16) | (isb[(s3 >> 8) & 0xFF] << 8) | isb[s2 & 0xFF]) ^ rk[last + 1],
+        ((isb[s2 >> 24] << 24) | (isb[(s1 >> 16) & 0xFF] << 16) | (isb[(s0 >> 8) & 0xFF] << 8) | isb[s3 & 0xFF]) ^ rk[last + 2],
+        ((isb[s3 >> 24] << 24) | (isb[(s2 >> 16) & 0xFF] << 16) | (isb[(s1 >> 8) & 0xFF] << 8) | isb[s0 & 0xFF]) ^ rk[last + 3],
+    )
+
+
+def decrypt_block_ttable(block, inv_round_words):
+    # Расшифровывает 16-байтовый блок по ключам из inv_key_expansion_words
+    s0 = int.from_bytes(block[0:4], "big")
+    s1 = int.from_bytes(block[4:8], "big")
+    s2 = int.from_bytes(block[8:12], "big")
+    s3 = int.from_bytes(block[12:16], "big")
+    t0, t1, t2, t3 = decrypt_words(s0, s1, s2, s3, inv_round_words)
+    return ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, "big")
+
+
+def aes_decrypt_block_reference(block, key):
+    # Пошаговая (эталонная) реализация расшифрования блока по стандарту FIPS-197
     state = list(block)
     round_keys = key_expansion(key)
 
-    state = add_round_key(state, round_keys[160:176])  # Начальный раунд
+    rounds = len(round_keys) // 16 - 1
 
-    for round_num in range(9, 0, -1):  # Обратные раунды
+    state = add_round_key(state, round_keys[rounds * 16:])  # Начальный раунд
+
+    for round_num in range(rounds - 1, 0, -1):  # Обратные раунды
         state = inv_shift_rows(state)
         state = inv_sub_bytes(state)
         state = add_round_key(state, round_keys[round_num * 16:(round_num + 1) * 16])
@@ -135,64 +256,283 @@ def unpad(data):
     return data[:-padding_len]  # Удаляем паддинг
 
 
-def aes_encrypt_cbc(plaintext, key, iv):
-    if len(plaintext) % 16 != 0:
-        plaintext = pad(plaintext)
-    #plaintext = pad(plaintext)  # Добавляем паддинг
-    ciphertext = b""
-    previous_block = iv  # Первый блок XOR'ится с IV
-
-    for i in range(0, len(plaintext), 16):
-        block = plaintext[i:i + 16]
-        block = bytes([b ^ p for b, p in zip(block, previous_block)])  # XOR с предыдущим
-        encrypted_block = aes_encrypt_block(block, key)
-        ciphertext += encrypted_block
-        previous_block = encrypted_block
-
-    return ciphertext
-
-
-def aes_decrypt_cbc(ciphertext, key, iv):
-    plaintext = b""
-    previous_block = iv
-
-    for i in range(0, len(ciphertext), 16):
-        block = ciphertext[i:i + 16]
-        decrypted_block = aes_decrypt_block(block, key)
-        plaintext += bytes([b ^ p for b, p in zip(decrypted_block, previous_block)])
-        previous_block = block
-
-    #return unpad(plaintext)
+def strip_padding(plaintext):
+    # Удаляет паддинг; если после удаления ничего не осталось,
+    # считаем, что паддинга не было, и возвращаем данные как есть
     unpad_plaintext = unpad(plaintext)
 
     if len(unpad_plaintext) == 0:
         return plaintext
 
-    return unpad(plaintext)
+    return unpad_plaintext
+
+
+MASK_128 = (1 << 128) - 1  # Счётчик CTR берётся по модулю 2^128
+
+
+def xor_bytes(first, second):
+    # XOR двух байтовых строк одинаковой длины
+    return (int.from_bytes(first, "big") ^ int.from_bytes(second, "big")).to_bytes(len(first), "big")
+
+
+def check_buffers(data, out):
+    # Проверяет, что данные выровнены по блоку и буфер результата достаточно велик
+    if len(data) % 16 != 0:
+        raise ValueError("Длина данных должна быть кратна 16 байтам")
+    if len(out) < len(data):
+        raise ValueError("Буфер результата меньше входных данных")
+
+
+class AESCipher:
+    """
+    Шифр AES с однократно расширенным ключом.
+
+    Ключи раундов хранятся плоскими списками 32-битных слов: для шифрования
+    и для эквивалентного обратного шифра. Повторные вызовы не запускают
+    key_expansion заново. Размер ключа (128, 192 или 256 бит) определяет
+    только число раундов: работа на раунд одинакова.
+    """
+
+    def __init__(self, key):
+        self.key = bytes(key)
+        self.rounds = key_parameters(self.key)[1]
+        self.round_words = key_expansion_words(self.key)
+        self.inv_round_words = inv_key_expansion_words(self.round_words)
+
+    def encrypt_block(self, block):
+        return encrypt_block_ttable(block, self.round_words)
+
+    def decrypt_block(self, block):
+        return decrypt_block_ttable(block, self.inv_round_words)
+
+    def encrypt_ecb_into(self, data, out):
+        # Шифрует выровненные по 16 байт данные в заранее выделенный буфер out
+        # (bytearray или memoryview). Блоки читаются и пишутся как 32-битные слова,
+        # поэтому на каждый блок не создаются новые байтовые объекты
+        check_buffers(data, out)
+        rk = self.round_words
+        for i in range(0, len(data), 16):
+            s0, s1, s2, s3 = unpack_from(">4I", data, i)
+            pack_into(">4I", out, i, *encrypt_words(s0, s1, s2, s3, rk))
+        return len(data)
+
+    def decrypt_ecb_into(self, data, out):
+        check_buffers(data, out)
+        rk = self.inv_round_words
+        for i in range(0, len(data), 16):
+            s0, s1, s2, s3 = unpack_from(">4I", data, i)
+            pack_into(">4I", out, i, *decrypt_words(s0, s1, s2, s3, rk))
+        return len(data)
+
+    def encrypt_cbc_into(self, data, iv, out):
+        check_buffers(data, out)
+        rk = self.round_words
+        p0, p1, p2, p3 = unpack_from(">4I", iv)  # Первый блок XOR'ится с IV
+        for i in range(0, len(data), 16):
+            s0, s1, s2, s3 = unpack_from(">4I", data, i)
+            p0, p1, p2, p3 = encrypt_words(s0 ^ p0, s1 ^ p1, s2 ^ p2, s3 ^ p3, rk)
+            pack_into(">4I", out, i, p0, p1, p2, p3)
+        return len(data)
+
+    def decrypt_cbc_into(self, data, iv, out):
+        # Можно расшифровывать на месте (out is data): блок шифртекста
+        # запоминается до того, как на его место будет записан открытый текст
+        check_buffers(data, out)
+        rk = self.inv_round_words
+        p0, p1, p2, p3 = unpack_from(">4I", iv)
+        for i in range(0, len(data), 16):
+            c0, c1, c2, c3 = unpack_from(">4I", data, i)
+            s0, s1, s2, s3 = decrypt_words(c0, c1, c2, c3, rk)
+            pack_into(">4I", out, i, s0 ^ p0, s1 ^ p1, s2 ^ p2, s3 ^ p3)
+            p0, p1, p2, p3 = c0, c1, c2, c3
+        return len(data)
+
+    def encrypt_cbc(self, plaintext, iv):
+        if len(plaintext) % 16 != 0:
+            plaintext = pad(plaintext)
+        ciphertext = bytearray(len(plaintext))  # Один буфер на весь результат
+        self.encrypt_cbc_into(plaintext, iv, ciphertext)
+        return bytes(ciphertext)
+
+    def decrypt_cbc(self, ciphertext, iv):
+        plaintext = bytearray(len(ciphertext))
+        self.decrypt_cbc_into(ciphertext, iv, plaintext)
+        return strip_padding(bytes(plaintext))
+
+    def encrypt_ecb(self, plaintext):
+        if len(plaintext) % 16 != 0:
+            plaintext = pad(plaintext)
+        ciphertext = bytearray(len(plaintext))
+        self.encrypt_ecb_into(plaintext, ciphertext)
+        return bytes(ciphertext)
+
+    def decrypt_ecb(self, ciphertext):
+        plaintext = bytearray(len(ciphertext))
+        self.decrypt_ecb_into(ciphertext, plaintext)
+        return strip_padding(bytes(plaintext))
+
+
+    def ctr_xor_into(self, data, initial_counter, out, offset=0):
+        # Режим CTR (NIST SP 800-38A): данные XOR'ятся с гаммой E(counter + i),
+        # счётчик - 128-битный. offset - смещение в байтах от начала потока,
+        # поэтому расшифровать можно любой фрагмент, не обрабатывая всё, что до него
+        if len(out) < len(data):
+            raise ValueError("Буфер результата меньше входных данных")
+        rk = self.round_words
+        counter = int.from_bytes(initial_counter, "big") + offset // 16
+        skip = offset % 16  # Сколько байт гаммы первого блока уже использовано
+        length = len(data)
+        position = 0
+
+        if skip:  # Начало посередине блока
+            take = min(16 - skip, length)
+            keystream = self.encrypt_block((counter & MASK_128).to_bytes(16, "big"))
+            out[0:take] = xor_bytes(data[0:take], keystream[skip:skip + take])
+            position = take
+            counter += 1
+
+        full_end = position + (length - position) // 16 * 16
+        for i in range(position, full_end, 16):
+            c = counter & MASK_128
+            k0, k1, k2, k3 = encrypt_words(c >> 96, (c >> 64) & 0xFFFFFFFF, (c >> 32) & 0xFFFFFFFF, c & 0xFFFFFFFF, rk)
+            d0, d1, d2, d3 = unpack_from(">4I", data, i)
+            pack_into(">4I", out, i, d0 ^ k0, d1 ^ k1, d2 ^ k2, d3 ^ k3)
+            counter += 1
+
+        if full_end < length:  # Неполный последний блок
+            keystream = self.encrypt_block((counter & MASK_128).to_bytes(16, "big"))
+            out[full_end:length] = xor_bytes(data[full_end:length], keystream[:length - full_end])
+        return length
+
+    def encrypt_ctr(self, data, initial_counter, offset=0):
+        out = bytearray(len(data))
+        self.ctr_xor_into(data, initial_counter, out, offset)
+        return bytes(out)
+
+    # В CTR расшифрование совпадает с шифрованием
+    decrypt_ctr = encrypt_ctr
+
+
+SCHEDULE_CACHE_SIZE = 32  # Сколько расширенных ключей держать в LRU-кэше
+
+
+@lru_cache(maxsize=SCHEDULE_CACHE_SIZE)
+def cached_cipher(key):
+    return AESCipher(key)
+
+
+def get_cipher(key):
+    # Возвращает объект шифра из LRU-кэша (ключ кэша - байты ключа)
+    return cached_cipher(bytes(key))
 
 
-def aes_encrypt_ecb(plaintext, key):
-    if len(plaintext) % 16 != 0:
-        plaintext = pad(plaintext)
-    ciphertext = b""
+def aes_encrypt_block(block, key):
+    return get_cipher(key).encrypt_block(block)
 
-    for i in range(0, len(plaintext), 16):
-        block = plaintext[i:i + 16]
-        ciphertext += aes_encrypt_block(block, key)
 
-    return ciphertext
+def aes_decrypt_block(block, key):
+    return get_cipher(key).decrypt_block(block)
 
 
-def aes_decrypt_ecb(ciphertext, key):
-    plaintext = b""
+def aes_encrypt_cbc(plaintext, key, iv):
+    return get_cipher(key).encrypt_cbc(plaintext, iv)
 
-    for i in range(0, len(ciphertext), 16):
-        block = ciphertext[i:i + 16]
-        plaintext += aes_decrypt_block(block, key)
 
-    unpad_plaintext = unpad(plaintext)
+def aes_decrypt_cbc(ciphertext, key, iv, workers=None):
+    if workers == 1 or len(ciphertext) < PARALLEL_THRESHOLD:
+        return get_cipher(key).decrypt_cbc(ciphertext, iv)
+    return strip_padding(decrypt_cbc_parallel(ciphertext, key, iv, workers))
 
-    if len(unpad_plaintext) == 0:
-        return plaintext
 
-    return unpad(plaintext)
\ No newline at end of file
+def aes_encrypt_ecb(plaintext, key):
+    return get_cipher(key).encrypt_ecb(plaintext)
+
+
+def aes_decrypt_ecb(ciphertext, key):
+    return get_cipher(key).decrypt_ecb(ciphertext)
+
+
+PARALLEL_THRESHOLD = 1 << 17  # Данные короче 128 КБ обрабатываются в текущем процессе
+CHUNK_SIZE = 1 << 16  # Размер части данных (кратен 16), отправляемой в рабочий процесс
+
+
+def split_chunks(length, chunk_size=CHUNK_SIZE):
+    # Границы частей [start, end) для раздачи по процессам
+    return [(start, min(start + chunk_size, length)) for start in range(0, length, chunk_size)]
+
+
+def ctr_worker(key, initial_counter, offset, chunk):
+    # Выполняется в рабочем процессе: обрабатывает одну часть потока CTR
+    return get_cipher(key).encrypt_ctr(chunk, initial_counter, offset)
+
+
+def aes_encrypt_ctr(data, key, initial_counter, offset=0, workers=None):
+    """
+    Шифрует (или расшифровывает) данные в режиме CTR.
+
+    :param data: Данные произвольной длины.
+    :param key: Ключ AES.
+    :param initial_counter: Начальный 16-байтовый блок счётчика.
+    :param offset: Смещение data в байтах от начала потока (для произвольного доступа).
+    :param workers: Число процессов; 1 - без пула, None - по числу ядер.
+    :return: Результат той же длины, что и data.
+    """
+    if workers == 1 or len(data) < PARALLEL_THRESHOLD:
+        return get_cipher(key).encrypt_ctr(data, initial_counter, offset)
+
+    # Гамма для каждой части вычисляется независимо: её счётчик определяется смещением
+    out = bytearray(len(data))
+    chunks = split_chunks(len(data))
+    key = bytes(key)
+    initial_counter = bytes(initial_counter)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            ctr_worker,
+            [key] * len(chunks),
+            [initial_counter] * len(chunks),
+            [offset + start for start, _ in chunks],
+            [bytes(data[start:end]) for start, end in chunks],
+        )
+        for (start, end), result in zip(chunks, results):
+            out[start:end] = result
+    return bytes(out)
+
+
+def aes_decrypt_ctr(data, key, initial_counter, offset=0, workers=None):
+    return aes_encrypt_ctr(data, key, initial_counter, offset, workers)
+
+
+def cbc_decrypt_worker(key, previous_block, chunk):
+    # Выполняется в рабочем процессе: расшифровывает часть CBC,
+    # где previous_block - последний блок шифртекста перед частью (или IV)
+    out = bytearray(len(chunk))
+    get_cipher(key).decrypt_cbc_into(chunk, previous_block, out)
+    return out
+
+
+def decrypt_cbc_parallel(ciphertext, key, iv, workers=None):
+    # Расшифрование CBC не имеет цепной зависимости: P[i] = D(C[i]) ^ C[i-1].
+    # Шифртекст делится на части с перекрытием в один блок (последний блок
+    # предыдущей части служит IV), части расшифровываются в пуле процессов.
+    # Паддинг не удаляется
+    check_buffers(ciphertext, ciphertext)
+    out = bytearray(len(ciphertext))
+    chunks = split_chunks(len(ciphertext))
+    key = bytes(key)
+    previous_blocks = [bytes(iv)] + [bytes(ciphertext[start - 16:start]) for start, _ in chunks[1:]]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            cbc_decrypt_worker,
+            [key] * len(chunks),
+            previous_blocks,
+            [bytes(ciphertext[start:end]) for start, end in chunks],
+        )
+        for (start, end), result in zip(chunks, results):
+            out[start:end] = result
+    return bytes(out)
+
+
+if os.environ.get("AES_PROFILE"):
+    # Инструментирование по переменной окружения: aes_profile сам проверяет
+    # AES_PROFILE в конце загрузки (см. aes_profile.py)
+    import aes_profile
@@ -0,0 +1,208 @@
+import numpy as np
+
+from aes import key_expansion, key_parameters, pad, strip_padding
+from aes_constants import S_BOX, INV_S_BOX, RCON, Nb, xtime, galois_multiplication
+
+# Векторизованный движок AES: N блоков хранятся как массив (N, 16) uint8
+# и каждое преобразование раунда выполняется сразу для всего пакета.
+
+SBOX = np.array(S_BOX, dtype=np.uint8)
+INV_SBOX = np.array(INV_S_BOX, dtype=np.uint8)
+
+# Таблицы умножения в GF(2^8) для MixColumns и InvMixColumns
+XTIME = np.array([xtime(i) & 0xFF for i in range(256)], dtype=np.uint8)
+MUL9 = np.array([galois_multiplication(i, 0x09) for i in range(256)], dtype=np.uint8)
+MUL11 = np.array([galois_multiplication(i, 0x0b) for i in range(256)], dtype=np.uint8)
+MUL13 = np.array([galois_multiplication(i, 0x0d) for i in range(256)], dtype=np.uint8)
+MUL14 = np.array([galois_multiplication(i, 0x0e) for i in range(256)], dtype=np.uint8)
+
+# ShiftRows как фиксированная перестановка 16 байтов состояния (см. shift_rows в aes.py)
+SHIFT_ROWS = np.array([0, 5, 10, 15, 4, 9, 14, 3, 8, 13, 2, 7, 12, 1, 6, 11])
+INV_SHIFT_ROWS = np.array([0, 13, 10, 7, 4, 1, 14, 11, 8, 5, 2, 15, 12, 9, 6, 3])
+
+BATCH_BLOCKS = 4096  # Сколько блоков обрабатывать за один проход (64 КБ данных)
+
+
+def expand_key_array(cipher_key):
+    # Ключи раундов в виде массива (Nr + 1, 16)
+    return np.array(key_expansion(cipher_key), dtype=np.uint8).reshape(-1, 16)
+
+
+def expand_keys_array(keys):
+    # Векторизованное расширение ключей: key_expansion выполняется сразу для
+    # всех ключей массива (K, длина ключа), результат - ключи раундов (K, Nr + 1, 16).
+    # Все ключи массива должны быть одной длины; длина берётся из формы массива,
+    # поэтому пустой массив (0, длина ключа) тоже допустим
+    keys = np.asarray(keys, dtype=np.uint8)
+    Nk, Nr = key_parameters(bytes(keys.shape[-1]))
+    keys = keys.reshape(-1, 4 * Nk)
+    words = np.empty((len(keys), Nb * (Nr + 1), 4), dtype=np.uint8)
+    words[:, :Nk] = keys.reshape(-1, Nk, 4)
+    for i in range(Nk, Nb * (Nr + 1)):
+        temp = words[:, i - 1]
+        if i % Nk == 0:
+            temp = SBOX[np.roll(temp, -1, axis=1)]  # RotWord + SubWord
+            temp[:, 0] ^= RCON[i // Nk]
+        elif Nk > 6 and i % Nk == 4:
+            temp = SBOX[temp]  # Дополнительный SubWord для AES-256
+        words[:, i] = words[:, i - Nk] ^ temp
+    return words.reshape(len(keys), Nr + 1, 16)
+
+
+def bytes_to_blocks(data):
+    # Представление байтов как массива блоков (N, 16) без копирования
+    return np.frombuffer(data, dtype=np.uint8).reshape(-1, 16)
+
+
+def mix_columns_batch(state):
+    # MixColumns для всех блоков: столбец (a0, a1, a2, a3) переходит в
+    # a_i ^ (a0 ^ a1 ^ a2 ^ a3) ^ xtime(a_i ^ a_(i+1))
+    columns = state.reshape(-1, 4, 4)
+    a0, a1, a2, a3 = columns[:, :, 0], columns[:, :, 1], columns[:, :, 2], columns[:, :, 3]
+    total = a0 ^ a1 ^ a2 ^ a3
+    mixed = np.empty_like(columns)
+    mixed[:, :, 0] = a0 ^ total ^ XTIME[a0 ^ a1]
+    mixed[:, :, 1] = a1 ^ total ^ XTIME[a1 ^ a2]
+    mixed[:, :, 2] = a2 ^ total ^ XTIME[a2 ^ a3]
+    mixed[:, :, 3] = a3 ^ total ^ XTIME[a3 ^ a0]
+    return mixed.reshape(-1, 16)
+
+
+def inv_mix_columns_batch(state):
+    # InvMixColumns через таблицы умножения на 14, 11, 13 и 9
+    columns = state.reshape(-1, 4, 4)
+    a0, a1, a2, a3 = columns[:, :, 0], columns[:, :, 1], columns[:, :, 2], columns[:, :, 3]
+    mixed = np.empty_like(columns)
+    mixed[:, :, 0] = MUL14[a0] ^ MUL11[a1] ^ MUL13[a2] ^ MUL9[a3]
+    mixed[:, :, 1] = MUL9[a0] ^ MUL14[a1] ^ MUL11[a2] ^ MUL13[a3]
+    mixed[:, :, 2] = MUL13[a0] ^ MUL9[a1] ^ MUL14[a2] ^ MUL11[a3]
+    mixed[:, :, 3] = MUL11[a0] ^ MUL13[a1] ^ MUL9[a2] ^ MUL14[a3]
+    return mixed.reshape(-1, 16)
+
+
+def encrypt_blocks(blocks, round_keys):
+    """
+    Шифрует пакет блоков.
+
+    :param blocks: Массив (N, 16) uint8.
+    :param round_keys: Ключи раундов (Nr + 1, 16), общие для всех блоков,
+                       или (N, Nr + 1, 16) - свой ключ для каждого блока.
+    :return: Массив (N, 16) uint8 с зашифрованными блоками.
+    """
+    rounds = round_keys.shape[-2] - 1
+    state = blocks ^ round_keys[..., 0, :]  # Начальный раунд
+
+    for round_num in range(1, rounds):
+        state = SBOX[state][:, SHIFT_ROWS]  # SubBytes + ShiftRows
+        state = mix_columns_batch(state)
+        state ^= round_keys[..., round_num, :]
+
+    # Финальный раунд без MixColumns
+    return SBOX[state][:, SHIFT_ROWS] ^ round_keys[..., rounds, :]
+
+
+def decrypt_blocks(blocks, round_keys):
+    """
+    Расшифровывает пакет блоков (прямой обратный шифр FIPS-197).
+
+    :param blocks: Массив (N, 16) uint8.
+    :param round_keys: Ключи раундов (Nr + 1, 16) или (N, Nr + 1, 16) - те же, что и для шифрования.
+    :return: Массив (N, 16) uint8 с расшифрованными блоками.
+    """
+    rounds = round_keys.shape[-2] - 1
+    state = blocks ^ round_keys[..., rounds, :]
+
+    for round_num in range(rounds - 1, 0, -1):
+        state = INV_SBOX[state[:, INV_SHIFT_ROWS]]  # InvShiftRows + InvSubBytes
+        state ^= round_keys[..., round_num, :]
+        state = inv_mix_columns_batch(state)
+
+    return INV_SBOX[state[:, INV_SHIFT_ROWS]] ^ round_keys[..., 0, :]
+
+
+def process_in_batches(function, blocks, round_keys, out):
+    # Прогоняет блоки через function частями по BATCH_BLOCKS, чтобы
+    # промежуточные массивы не разрастались на больших буферах
+    for i in range(0, len(blocks), BATCH_BLOCKS):
+        out[i:i + BATCH_BLOCKS] = function(blocks[i:i + BATCH_BLOCKS], round_keys)
+    return out
+
+
+def counter_blocks(initial_counter, n_blocks):
+    # Блоки счётчика initial_counter, initial_counter + 1, ... (128-битный счётчик
+    # по модулю 2^128), собранные из двух 64-битных половин с переносом
+    counter = int.from_bytes(initial_counter, "big")
+    high, low = np.uint64(counter >> 64), np.uint64(counter & 0xFFFFFFFFFFFFFFFF)
+    lows = low + np.arange(n_blocks, dtype=np.uint64)
+    highs = high + (lows < low).astype(np.uint64)  # Перенос при переполнении младшей половины
+    halves = np.stack([highs, lows], axis=1).astype(">u8")
+    return halves.view(np.uint8).reshape(n_blocks, 16)
+
+
+def aes_ctr_keystream_batch(key, initial_counter, n_blocks):
+    # Гамма режима CTR для n_blocks блоков: E(counter + i)
+    round_keys = expand_key_array(key)
+    keystream = np.empty((n_blocks, 16), dtype=np.uint8)
+    for i in range(0, n_blocks, BATCH_BLOCKS):
+        count = min(BATCH_BLOCKS, n_blocks - i)
+        counter = (int.from_bytes(initial_counter, "big") + i) % (1 << 128)
+        keystream[i:i + count] = encrypt_blocks(counter_blocks(counter.to_bytes(16, "big"), count), round_keys)
+    return keystream.tobytes()
+
+
+def aes_encrypt_ecb_batch(plaintext, key):
+    if len(plaintext) % 16 != 0:
+        plaintext = pad(plaintext)
+    blocks = bytes_to_blocks(plaintext)
+    out = np.empty_like(blocks)
+    return process_in_batches(encrypt_blocks, blocks, expand_key_array(key), out).tobytes()
+
+
+def aes_decrypt_ecb_batch(ciphertext, key):
+    blocks = bytes_to_blocks(ciphertext)
+    out = np.empty_like(blocks)
+    return strip_padding(process_in_batches(decrypt_blocks, blocks, expand_key_array(key), out).tobytes())
+
+
+def aes_decrypt_cbc_batch(ciphertext, key, iv):
+    # В CBC каждый блок открытого текста зависит только от C[i-1] и C[i],
+    # поэтому все блоки расшифровываются одним пакетом и XOR'ятся со сдвинутым шифртекстом
+    blocks = bytes_to_blocks(ciphertext)
+    out = np.empty_like(blocks)
+    process_in_batches(decrypt_blocks, blocks, expand_key_array(key), out)
+    if len(blocks):
+        out[0] ^= bytes_to_blocks(iv)[0]
+        out[1:] ^= blocks[:-1]
+    return strip_padding(out.tobytes())
+
+
+def crypt_multikey(function, keys, blocks):
+    # Пары (ключ, блок) обрабатываются пакетами: на пакет - одно векторизованное
+    # расширение ключей и один проход раундов
+    # Количество и длины проверяются до reshape, иначе ошибка была бы невнятной
+    keys = [bytes(key) for key in keys]
+    blocks = [bytes(block) for block in blocks]
+    if len(keys) != len(blocks):
+        raise ValueError("Количество ключей и блоков должно совпадать")
+    if not keys:
+        return []
+    if len({len(key) for key in keys}) > 1:
+        raise ValueError("Все ключи пакета должны быть одной длины")
+    if any(len(block) != 16 for block in blocks):
+        raise ValueError("Длина блока AES должна быть 16 байт")
+    keys = np.frombuffer(b"".join(keys), dtype=np.uint8).reshape(len(keys), -1)
+    blocks = np.frombuffer(b"".join(blocks), dtype=np.uint8).reshape(-1, 16)
+    out = np.empty_like(blocks)
+    for i in range(0, len(blocks), BATCH_BLOCKS):
+        round_keys = expand_keys_array(keys[i:i + BATCH_BLOCKS])
+        out[i:i + BATCH_BLOCKS] = function(blocks[i:i + BATCH_BLOCKS], round_keys)
+    return [bytes(block) for block in out]
+
+
+def aes_encrypt_blocks_multikey(keys, blocks):
+    # Шифрует blocks[i] на ключе keys[i] для всех i; возвращает список блоков
+    return crypt_multikey(encrypt_blocks, keys, blocks)
+
+
+def aes_decrypt_blocks_multikey(keys, blocks):
+    return crypt_multikey(decrypt_blocks, keys, blocks)
@@ -0,0 +1,275 @@
+from aes import key_expansion, pad, xor_bytes, MASK_128
+
+# Битслайсинговый движок AES на длинных целых Python.
+#
+# Пакет из N блоков раскладывается на 128 битовых плоскостей: плоскость
+# номер 8 * i + k содержит бит k байта i каждого блока. Бит блока b лежит
+# в плоскости на позиции 8 * b, так что раскладка сводится к int.from_bytes
+# по столбцу байтов и сдвигам. Одна операция над длинным целым обрабатывает
+# весь пакет, а SubBytes вычисляется булевой схемой без обращений к таблицам.
+
+BITSLICE_BLOCKS = 16384  # Размер пакета в блоках (256 КБ данных)
+
+# ShiftRows как перестановка байтов (см. shift_rows в aes.py)
+SHIFT_ROWS = [0, 5, 10, 15, 4, 9, 14, 3, 8, 13, 2, 7, 12, 1, 6, 11]
+
+
+def lane_mask(n_blocks):
+    # Единица в младшем бите каждого из n_blocks байтов - "все единицы" для плоскости
+    return int.from_bytes(b"\x01" * n_blocks, "little")
+
+
+def to_planes(data, n_blocks, ones):
+    # Раскладывает n_blocks блоков из data на 128 плоскостей
+    planes = [0] * 128
+    for i in range(16):
+        column = int.from_bytes(data[i::16], "little")  # i-е байты всех блоков
+        for bit in range(8):
+            planes[i * 8 + bit] = (column >> bit) & ones
+    return planes
+
+
+def from_planes(planes, n_blocks, out):
+    # Обратная раскладка: собирает байты из плоскостей в буфер out
+    for i in range(16):
+        column = 0
+        for bit in range(8):
+            column |= planes[i * 8 + bit] << bit
+        out[i::16] = column.to_bytes(n_blocks, "little")
+
+
+def sbox_circuit(u0, u1, u2, u3, u4, u5, u6, u7, ones):
+    # Булева схема S-Box AES (Boyar-Peralta, 113 вентилей XOR/AND/XNOR).
+    # u0 - старший бит входного байта, результат - биты от старшего к младшему.
+    # Верхний линейный слой
+    t1 = u0 ^ u3
+    t2 = u0 ^ u5
+    t3 = u0 ^ u6
+    t4 = u3 ^ u5
+    t5 = u4 ^ u6
+    t6 = t1 ^ t5
+    t7 = u1 ^ u2
+    t8 = u7 ^ t6
+    t9 = u7 ^ t7
+    t10 = t6 ^ t7
+    t11 = u1 ^ u5
+    t12 = u2 ^ u5
+    t13 = t3 ^ t4
+    t14 = t6 ^ t11
+    t15 = t5 ^ t11
+    t16 = t5 ^ t12
+    t17 = t9 ^ t16
+    t18 = u3 ^ u7
+    t19 = t7 ^ t18
+    t20 = t1 ^ t19
+    t21 = u6 ^ u7
+    t22 = t7 ^ t21
+    t23 = t2 ^ t22
+    t24 = t2 ^ t10
+    t25 = t20 ^ t17
+    t26 = t3 ^ t16
+    t27 = t1 ^ t12
+
+    # Нелинейная часть (обращение в GF(2^4))
+    m1 = t13 & t6
+    m2 = t23 & t8
+    m3 = t14 ^ m1
+    m4 = t19 & u7
+    m5 = m4 ^ m1
+    m6 = t3 & t16
+    m7 = t22 & t9
+    m8 = t26 ^ m6
+    m9 = t20 & t17
+    m10 = m9 ^ m6
+    m11 = t1 & t15
+    m12 = t4 & t27
+    m13 = m12 ^ m11
+    m14 = t2 & t10
+    m15 = m14 ^ m11
+    m16 = m3 ^ m2
+    m17 = m5 ^ t24
+    m18 = m8 ^ m7
+    m19 = m10 ^ m15
+    m20 = m16 ^ m13
+    m21 = m17 ^ m15
+    m22 = m18 ^ m13
+    m23 = m19 ^ t25
+    m24 = m22 ^ m23
+    m25 = m22 & m20
+    m26 = m21 ^ m25
+    m27 = m20 ^ m21
+    m28 = m23 ^ m25
+    m29 = m28 & m27
+    m30 = m26 & m24
+    m31 = m20 & m23
+    m32 = m27 & m31
+    m33 = m27 ^ m25
+    m34 = m21 & m22
+    m35 = m24 & m34
+    m36 = m24 ^ m25
+    m37 = m21 ^ m29
+    m38 = m32 ^ m33
+    m39 = m23 ^ m30
+    m40 = m35 ^ m36
+    m41 = m38 ^ m40
+    m42 = m37 ^ m39
+    m43 = m37 ^ m38
+    m44 = m39 ^ m40
+    m45 = m42 ^ m41
+    m46 = m44 & t6
+    m47 = m40 & t8
+    m48 = m39 & u7
+    m49 = m43 & t16
+    m50 = m38 & t9
+    m51 = m37 & t17
+    m52 = m42 & t15
+    m53 = m45 & t27
+    m54 = m41 & t10
+    m55 = m44 & t13
+    m56 = m40 & t23
+    m57 = m39 & t19
+    m58 = m43 & t3
+    m59 = m38 & t22
+    m60 = m37 & t20
+    m61 = m42 & t1
+    m62 = m45 & t4
+    m63 = m41 & t2
+
+    # Нижний линейный слой
+    l0 = m61 ^ m62
+    l1 = m50 ^ m56
+    l2 = m46 ^ m48
+    l3 = m47 ^ m55
+    l4 = m54 ^ m58
+    l5 = m49 ^ m61
+    l6 = m62 ^ l5
+    l7 = m46 ^ l3
+    l8 = m51 ^ m59
+    l9 = m52 ^ m53
+    l10 = m53 ^ l4
+    l11 = m60 ^ l2
+    l12 = m48 ^ m51
+    l13 = m50 ^ l0
+    l14 = m52 ^ m61
+    l15 = m55 ^ l1
+    l16 = m56 ^ l0
+    l17 = m57 ^ l1
+    l18 = m58 ^ l8
+    l19 = m63 ^ l4
+    l20 = l0 ^ l1
+    l21 = l1 ^ l7
+    l22 = l3 ^ l12
+    l23 = l18 ^ l2
+    l24 = l15 ^ l9
+    l25 = l6 ^ l10
+    l26 = l7 ^ l9
+    l27 = l8 ^ l10
+    l28 = l11 ^ l14
+    l29 = l11 ^ l17
+
+    return (
+        l6 ^ l24,
+        l16 ^ l26 ^ ones,  # XNOR
+        l19 ^ l28 ^ ones,
+        l6 ^ l21,
+        l20 ^ l22,
+        l25 ^ l29,
+        l13 ^ l27 ^ ones,
+        l6 ^ l23 ^ ones,
+    )
+
+
+def sub_bytes_planes(planes, ones):
+    # SubBytes для всех 16 байтов сразу по всему пакету
+    result = [0] * 128
+    for i in range(0, 128, 8):
+        s = sbox_circuit(
+            planes[i + 7], planes[i + 6], planes[i + 5], planes[i + 4],
+            planes[i + 3], planes[i + 2], planes[i + 1], planes[i], ones
+        )
+        result[i:i + 8] = s[::-1]  # Возвращаем порядок "младший бит первым"
+    return result
+
+
+def shift_rows_planes(planes):
+    # ShiftRows - это просто перестановка плоскостей по байтам
+    result = []
+    for byte in SHIFT_ROWS:
+        result.extend(planes[byte * 8:byte * 8 + 8])
+    return result
+
+
+def xtime_planes(a):
+    # Умножение байта на x в битовых плоскостях: сдвиг и XOR старшего бита в позиции 0, 1, 3, 4
+    top = a[7]
+    return [top, a[0] ^ top, a[1], a[2] ^ top, a[3] ^ top, a[4], a[5], a[6]]
+
+
+def mix_columns_planes(planes):
+    # MixColumns: b_i = a_i ^ (a0 ^ a1 ^ a2 ^ a3) ^ xtime(a_i ^ a_(i+1))
+    result = [0] * 128
+    for col in range(4):
+        base = col * 32
+        a = [planes[base + r * 8:base + r * 8 + 8] for r in range(4)]
+        total = [a[0][k] ^ a[1][k] ^ a[2][k] ^ a[3][k] for k in range(8)]
+        for r in range(4):
+            doubled = xtime_planes([a[r][k] ^ a[(r + 1) % 4][k] for k in range(8)])
+            offset = base + r * 8
+            for k in range(8):
+                result[offset + k] = a[r][k] ^ total[k] ^ doubled[k]
+    return result
+
+
+def round_key_bits(cipher_key):
+    # Биты ключей раундов: для каждого раунда 128 значений 0/1 в порядке плоскостей
+    round_keys = key_expansion(cipher_key)
+    return [
+        [(round_keys[r * 16 + (k >> 3)] >> (k & 7)) & 1 for k in range(128)]
+        for r in range(len(round_keys) // 16)
+    ]
+
+
+def encrypt_planes(planes, key_bits, ones):
+    # Раунды AES над плоскостями. Ключ раунда разворачивается в маски (0 или
+    # "все единицы") и XOR'ится всегда, без ветвлений по битам ключа
+    key_masks = [[ones * bit for bit in bits] for bits in key_bits]
+    rounds = len(key_masks) - 1
+    planes = [p ^ k for p, k in zip(planes, key_masks[0])]
+    for round_num in range(1, rounds + 1):
+        planes = shift_rows_planes(sub_bytes_planes(planes, ones))
+        if round_num != rounds:  # В последнем раунде нет MixColumns
+            planes = mix_columns_planes(planes)
+        planes = [p ^ k for p, k in zip(planes, key_masks[round_num])]
+    return planes
+
+
+def encrypt_blocks_bitsliced(data, key_bits, out):
+    # Шифрует выровненные данные пакетами по BITSLICE_BLOCKS блоков в буфер out
+    step = BITSLICE_BLOCKS * 16
+    for start in range(0, len(data), step):
+        chunk = data[start:start + step]
+        n_blocks = len(chunk) // 16
+        ones = lane_mask(n_blocks)
+        planes = encrypt_planes(to_planes(chunk, n_blocks, ones), key_bits, ones)
+        view = memoryview(out)[start:start + len(chunk)]
+        from_planes(planes, n_blocks, view)
+    return out
+
+
+def aes_encrypt_ecb_bitsliced(plaintext, key):
+    if len(plaintext) % 16 != 0:
+        plaintext = pad(plaintext)
+    out = bytearray(len(plaintext))
+    return bytes(encrypt_blocks_bitsliced(bytes(plaintext), round_key_bits(key), out))
+
+
+def aes_encrypt_ctr_bitsliced(data, key, initial_counter):
+    # CTR: гамма - шифрование блоков счётчика тем же битслайсинговым движком
+    n_blocks = (len(data) + 15) // 16
+    counter = int.from_bytes(initial_counter, "big")
+    counters = b"".join(((counter + i) & MASK_128).to_bytes(16, "big") for i in range(n_blocks))
+    keystream = encrypt_blocks_bitsliced(counters, round_key_bits(key), bytearray(len(counters)))
+    return xor_bytes(data, keystream[:len(data)])
+
+
+aes_decrypt_ctr_bitsliced = aes_encrypt_ctr_bitsliced
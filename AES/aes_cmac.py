@@ -0,0 +1,156 @@
+from hmac import compare_digest
+from struct import unpack_from
+
+import numpy as np
+
+from aes import get_cipher, encrypt_words
+from aes_batch import encrypt_blocks, expand_key_array
+
+# AES-CMAC (NIST SP 800-38B, RFC 4493). Подключи K1 и K2 вычисляются один раз
+# на ключ, расширенный ключ берётся из общего LRU-кэша (get_cipher).
+
+MASK_128 = (1 << 128) - 1
+MIN_TAG_LENGTH = 8  # SP 800-38B: тег короче 64 бит допустим только при особом анализе рисков
+
+
+def double(value):
+    # Умножение на x в GF(2^128) для подключей CMAC (сдвиг влево, редукция 0x87)
+    value <<= 1
+    if value >> 128:
+        value = (value & MASK_128) ^ 0x87
+    return value
+
+
+def split_words(value):
+    return value >> 96, (value >> 64) & 0xFFFFFFFF, (value >> 32) & 0xFFFFFFFF, value & 0xFFFFFFFF
+
+
+def cmac_subkeys(cipher):
+    # K1 = L * x, K2 = L * x^2, где L = E_K(0^128)
+    l_value = int.from_bytes(cipher.encrypt_block(bytes(16)), "big")
+    k1 = double(l_value)
+    return k1, double(k1)
+
+
+class AESCMAC:
+    """
+    Инкрементальный AES-CMAC.
+
+    update() поглощает полные блоки прямо из переданного буфера (через
+    unpack_from по смещению), копируется только хвост до 16 байт, который
+    может оказаться последним блоком сообщения.
+
+    Длина тега фиксируется в конструкторе: verify() принимает только тег
+    ровно этой длины, иначе отправитель мог бы сам укоротить проверку.
+    """
+
+    def __init__(self, key, tag_length=16):
+        if not MIN_TAG_LENGTH <= tag_length <= 16:
+            raise ValueError("Длина тега CMAC должна быть от 8 до 16 байт")
+        self.tag_length = tag_length
+        self.cipher = get_cipher(key)
+        self.k1, self.k2 = cmac_subkeys(self.cipher)
+        self.state = (0, 0, 0, 0)
+        self.pending = b""
+
+    def copy(self):
+        other = AESCMAC.__new__(AESCMAC)
+        other.cipher, other.k1, other.k2 = self.cipher, self.k1, self.k2
+        other.tag_length = self.tag_length
+        other.state, other.pending = self.state, self.pending
+        return other
+
+    def update(self, data):
+        rk = self.cipher.round_words
+        s0, s1, s2, s3 = self.state
+        length = len(data)
+        position = 0
+
+        if self.pending:  # Сначала дополняем хвост предыдущего вызова
+            if len(self.pending) == 16 and length:
+                d0, d1, d2, d3 = unpack_from(">4I", self.pending)
+                s0, s1, s2, s3 = encrypt_words(s0 ^ d0, s1 ^ d1, s2 ^ d2, s3 ^ d3, rk)
+                self.pending = b""
+            else:
+                position = min(16 - len(self.pending), length)
+                self.pending += bytes(data[:position])
+                if len(self.pending) == 16 and position < length:
+                    d0, d1, d2, d3 = unpack_from(">4I", self.pending)
+                    s0, s1, s2, s3 = encrypt_words(s0 ^ d0, s1 ^ d1, s2 ^ d2, s3 ^ d3, rk)
+                    self.pending = b""
+
+        # Полные блоки, кроме последнего (он может оказаться финальным)
+        while length - position > 16:
+            d0, d1, d2, d3 = unpack_from(">4I", data, position)
+            s0, s1, s2, s3 = encrypt_words(s0 ^ d0, s1 ^ d1, s2 ^ d2, s3 ^ d3, rk)
+            position += 16
+
+        if position < length:
+            self.pending = bytes(data[position:])
+        self.state = (s0, s1, s2, s3)
+        return self
+
+    def digest(self):
+        # Не меняет состояние, поэтому update() можно продолжать после digest()
+        if len(self.pending) == 16:
+            last = int.from_bytes(self.pending, "big") ^ self.k1
+        else:
+            padded = self.pending + b"\x80" + bytes(15 - len(self.pending))
+            last = int.from_bytes(padded, "big") ^ self.k2
+        d0, d1, d2, d3 = split_words(last)
+        s0, s1, s2, s3 = self.state
+        t0, t1, t2, t3 = encrypt_words(s0 ^ d0, s1 ^ d1, s2 ^ d2, s3 ^ d3, self.cipher.round_words)
+        tag = ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, "big")
+        return tag[:self.tag_length]  # Усечённый тег - старшие байты
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def verify(self, tag):
+        # Сравнение за постоянное время; тег другой длины отвергается сразу
+        if len(tag) != self.tag_length:
+            raise ValueError("Неверная длина тега CMAC")
+        if not compare_digest(self.digest(), bytes(tag)):
+            raise ValueError("Код аутентификации CMAC не совпадает")
+
+
+def aes_cmac(message, key, tag_length=16):
+    return AESCMAC(key, tag_length).update(message).digest()
+
+
+def aes_cmac_batch(key, messages):
+    """
+    Вычисляет CMAC для множества коротких сообщений одним пакетом.
+
+    Блоки всех сообщений раскладываются в массив (M, max_blocks, 16), и на
+    шаге j одним вызовом encrypt_blocks обрабатываются j-е блоки всех
+    сообщений, у которых они есть.
+
+    :param key: Ключ AES.
+    :param messages: Список сообщений (bytes).
+    :return: Список тегов по 16 байт.
+    """
+    cipher = get_cipher(key)
+    k1, k2 = cmac_subkeys(cipher)
+    counts = np.array([max(1, (len(message) + 15) // 16) for message in messages], dtype=np.int64)
+    if not len(counts):
+        return []
+    blocks = np.zeros((len(messages), counts.max(), 16), dtype=np.uint8)
+
+    for index, message in enumerate(messages):
+        n_blocks = counts[index]
+        # Последний блок: полный - XOR с K1, иначе дополнение 10...0 и XOR с K2
+        if len(message) and len(message) % 16 == 0:
+            last = int.from_bytes(message[-16:], "big") ^ k1
+        else:
+            tail = message[(n_blocks - 1) * 16:]
+            last = int.from_bytes(tail + b"\x80" + bytes(15 - len(tail)), "big") ^ k2
+        data = bytes(message[:(n_blocks - 1) * 16]) + last.to_bytes(16, "big")
+        blocks[index, :n_blocks] = np.frombuffer(data, dtype=np.uint8).reshape(-1, 16)
+
+    round_keys = expand_key_array(key)
+    state = np.zeros((len(messages), 16), dtype=np.uint8)
+    for j in range(blocks.shape[1]):
+        active = counts > j
+        state[active] = encrypt_blocks(state[active] ^ blocks[active, j], round_keys)
+    return [bytes(tag) for tag in state]
@@ -42,6 +42,75 @@ inv_mix_matrix = [
     [0x0b, 0x0d, 0x09, 0x0e]
 ]
 
-Nk = 4  # Кол-во 32-битных слов в ключе (4 слова по 4 байта для AES-128)
 Nb = 4  # Кол-во слов в блоке (фиксированное для AES)
-Nr = 10  # Кол-во раундов (10 для AES-128)
\ No newline at end of file
+
+# Длина ключа в байтах -> (Nk, Nr) для AES-128, AES-192 и AES-256
+KEY_SIZES = {
+    16: (4, 10),
+    24: (6, 12),
+    32: (8, 14),
+}
+
+
+def xtime(byte):
+    # Умножение байта на x (то есть на 0x02) в поле GF(2^8) по модулю полинома AES
+    byte <<= 1
+    if byte & 0x100:
+        byte ^= 0x11b
+    return byte
+
+
+def rotate_word_right(word):
+    # Циклический сдвиг 32-битного слова вправо на 1 байт
+    return ((word >> 8) | (word << 24)) & 0xFFFFFFFF
+
+
+def galois_multiplication(byte_a, byte_b):
+    # Умножение в поле Галуа GF(2^8) используется в MixColumns
+    result = 0
+    for _ in range(8):  # По каждому биту
+        if byte_b & 1:  # Если младший бит b равен 1
+            result ^= byte_a  # XOR byte_a в результат
+        carry = byte_a & 0x80  # Проверка переполнения (старший бит)
+        byte_a <<= 1  # Умножение на x (сдвиг влево)
+        if carry:
+            byte_a ^= 0x1b  # При переполнении применяем модуль (редуцируем по полиному AES)
+        byte_b >>= 1  # Сдвигаем byte_b вправо
+    return result & 0xFF  # Обрезаем до 1 байта (8 бит)
+
+
+def build_encrypt_tables():
+    # T-таблицы шифрования: SubBytes + ShiftRows + MixColumns для одного байта столбца.
+    # TE0[x] - это столбец (2*S[x], S[x], S[x], 3*S[x]), записанный как 32-битное слово
+    # (первый байт столбца - в старших битах), TE1..TE3 - его циклические сдвиги
+    te0, te1, te2, te3 = [0] * 256, [0] * 256, [0] * 256, [0] * 256
+    for i in range(256):
+        s = S_BOX[i]
+        s2 = xtime(s)
+        s3 = s2 ^ s
+        te0[i] = (s2 << 24) | (s << 16) | (s << 8) | s3
+        te1[i] = rotate_word_right(te0[i])
+        te2[i] = rotate_word_right(te1[i])
+        te3[i] = rotate_word_right(te2[i])
+    return te0, te1, te2, te3
+
+
+def build_decrypt_tables():
+    # T-таблицы расшифрования (эквивалентный обратный шифр, FIPS-197 п. 5.3.5):
+    # InvSubBytes + InvShiftRows + InvMixColumns. TD0[x] - это столбец
+    # (14*S'[x], 9*S'[x], 13*S'[x], 11*S'[x]), где S' - обратный S-Box
+    td0, td1, td2, td3 = [0] * 256, [0] * 256, [0] * 256, [0] * 256
+    for i in range(256):
+        s = INV_S_BOX[i]
+        td0[i] = (
+            (galois_multiplication(s, 0x0e) << 24) | (galois_multiplication(s, 0x09) << 16) |
+            (galois_multiplication(s, 0x0d) << 8) | galois_multiplication(s, 0x0b)
+        )
+        td1[i] = rotate_word_right(td0[i])
+        td2[i] = rotate_word_right(td1[i])
+        td3[i] = rotate_word_right(td2[i])
+    return td0, td1, td2, td3
+
+
+TE0, TE1, TE2, TE3 = build_encrypt_tables()
+TD0, TD1, TD2, TD3 = build_decrypt_tables()
@@ -0,0 +1,233 @@
+from hmac import compare_digest
+from struct import pack_into, unpack_from
+
+from aes import get_cipher, encrypt_words
+
+# Режим GCM (NIST SP 800-38D): шифрование CTR и аутентификация GHASH за один проход.
+# Элементы GF(2^128) хранятся как 128-битные числа в порядке GCM: старший бит
+# числа - коэффициент при x^0, младший - при x^127.
+
+R_POLY = 0xE1 << 120  # Редукция по модулю x^128 + x^7 + x^2 + x + 1
+MASK_32 = 0xFFFFFFFF
+TAG_LENGTHS = (16, 15, 14, 13, 12, 8, 4)  # Допустимые длины тега по SP 800-38D (в байтах)
+
+
+def mul_x(value):
+    # Умножение элемента GF(2^128) на x (сдвиг вправо в представлении GCM)
+    if value & 1:
+        return (value >> 1) ^ R_POLY
+    return value >> 1
+
+
+def gf128_multiply(x, y):
+    # Побитовое умножение в GF(2^128) (алгоритм 1 из SP 800-38D), эталон для таблиц
+    result = 0
+    for bit in range(127, -1, -1):
+        if (x >> bit) & 1:
+            result ^= y
+        y = mul_x(y)
+    return result
+
+
+def build_reduce_table():
+    # REDUCE[b] - то, что добавляет редукция, когда младший байт b
+    # выдвигается при умножении на x^8 (не зависит от ключа)
+    table = []
+    for byte in range(256):
+        value = byte
+        for _ in range(8):
+            value = mul_x(value)
+        table.append(value)
+    return table
+
+
+REDUCE = build_reduce_table()
+
+
+def ghash_table(h):
+    # Таблица Шоупа для ключа H: M[b] = b * H, где байт b стоит на месте
+    # коэффициентов x^0..x^7. Заполняется по линейности из степеней x
+    table = [0] * 256
+    value = h
+    for bit in (0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01):
+        table[bit] = value
+        value = mul_x(value)
+    for byte in range(3, 256):
+        low_bit = byte & -byte
+        if byte != low_bit:
+            table[byte] = table[low_bit] ^ table[byte ^ low_bit]
+    return table
+
+
+def ghash_multiply(x, table):
+    # X * H по схеме Горнера по байтам: Z = Z * x^8 ^ M[x_i], начиная с последнего байта X
+    reduce = REDUCE
+    z = table[x & 0xFF]
+    for shift in range(8, 128, 8):
+        z = (z >> 8) ^ reduce[z & 0xFF] ^ table[(x >> shift) & 0xFF]
+    return z
+
+
+def ghash(table, data, y=0):
+    # GHASH по данным, дополненным нулями до кратности 16 байтам
+    if len(data) % 16:
+        data = bytes(data) + bytes(16 - len(data) % 16)
+    for i in range(0, len(data), 16):
+        y = ghash_multiply(y ^ int.from_bytes(data[i:i + 16], "big"), table)
+    return y
+
+
+class GCMContext:
+    """
+    Потоковое шифрование или расшифрование GCM.
+
+    update() обрабатывает только полные блоки (остаток меньше 16 байт
+    копится до следующего вызова), поэтому гамма CTR и GHASH по шифртексту
+    считаются в одном цикле. При расшифровании update() возвращает ещё не
+    проверенный открытый текст: его нельзя использовать, пока finalize()
+    не проверил тег. После finalize() контекст больше не используется.
+    """
+
+    def __init__(self, gcm, iv, aad, encrypting):
+        self.round_words = gcm.cipher.round_words
+        self.table = gcm.table
+        self.tag_length = gcm.tag_length
+        self.encrypting = encrypting
+        initial_counter = gcm.initial_counter(iv)
+        self.tag_mask = gcm.cipher.encrypt_block(initial_counter)  # E(J0) маскирует тег
+        self.counter = int.from_bytes(initial_counter, "big")
+        self.aad_length = len(aad)
+        self.data_length = 0
+        self.y = ghash(self.table, aad)
+        self.pending = bytearray()
+        self.finalized = False
+
+    def next_counter(self):
+        # inc32: увеличивается только младшее 32-битное слово счётчика
+        self.counter = (self.counter & ~MASK_32) | ((self.counter + 1) & MASK_32)
+        return self.counter
+
+    def process_blocks(self, data, out):
+        rk = self.round_words
+        table = self.table
+        encrypting = self.encrypting
+        y = self.y
+        for i in range(0, len(data), 16):
+            c = self.next_counter()
+            k0, k1, k2, k3 = encrypt_words(c >> 96, (c >> 64) & MASK_32, (c >> 32) & MASK_32, c & MASK_32, rk)
+            d0, d1, d2, d3 = unpack_from(">4I", data, i)
+            o0, o1, o2, o3 = d0 ^ k0, d1 ^ k1, d2 ^ k2, d3 ^ k3
+            pack_into(">4I", out, i, o0, o1, o2, o3)
+            if encrypting:  # GHASH всегда считается по шифртексту
+                y = ghash_multiply(y ^ ((o0 << 96) | (o1 << 64) | (o2 << 32) | o3), table)
+            else:
+                y = ghash_multiply(y ^ ((d0 << 96) | (d1 << 64) | (d2 << 32) | d3), table)
+        self.y = y
+
+    def update(self, data):
+        if self.finalized:
+            raise ValueError("Контекст GCM уже завершён")
+        self.data_length += len(data)
+        if self.pending:
+            data = bytes(self.pending) + bytes(data)
+            self.pending = bytearray()
+        full_length = len(data) // 16 * 16
+        out = bytearray(full_length)
+        self.process_blocks(memoryview(data)[:full_length], out)
+        self.pending += data[full_length:]
+        return bytes(out)
+
+    def finish(self):
+        # Обрабатывает неполный последний блок и вычисляет тег (один раз)
+        if self.finalized:
+            raise ValueError("Контекст GCM уже завершён")
+        self.finalized = True
+        tail = bytes(self.pending)
+        out = b""
+        if tail:
+            c = self.next_counter()
+            keystream = encrypt_words(c >> 96, (c >> 64) & MASK_32, (c >> 32) & MASK_32, c & MASK_32, self.round_words)
+            keystream = b"".join(word.to_bytes(4, "big") for word in keystream)
+            out = bytes(a ^ b for a, b in zip(tail, keystream))
+            self.y = ghash(self.table, out if self.encrypting else tail, self.y)
+        lengths = ((self.aad_length * 8) << 64) | (self.data_length * 8)
+        s = ghash_multiply(self.y ^ lengths, self.table)
+        tag = (s ^ int.from_bytes(self.tag_mask, "big")).to_bytes(16, "big")
+        return out, tag
+
+
+class GCMEncryptor(GCMContext):
+    def __init__(self, gcm, iv, aad=b""):
+        super().__init__(gcm, iv, aad, encrypting=True)
+
+    def finalize(self):
+        # Возвращает остаток шифртекста и тег (старшие tag_length байт)
+        out, tag = self.finish()
+        return out, tag[:self.tag_length]
+
+
+class GCMDecryptor(GCMContext):
+    def __init__(self, gcm, iv, aad=b""):
+        super().__init__(gcm, iv, aad, encrypting=False)
+
+    def finalize(self, tag):
+        # Возвращает остаток открытого текста; при несовпадении тега - ValueError.
+        # Длину тега задаёт получатель (AESGCM), тег другой длины отвергается
+        out, expected = self.finish()
+        if len(tag) != self.tag_length or not compare_digest(expected[:self.tag_length], bytes(tag)):
+            raise ValueError("Тег аутентификации GCM не совпадает")
+        return out
+
+
+class AESGCM:
+    """
+    AES-GCM на общем движке AES.
+
+    Для ключа один раз вычисляются H = E(0^128) и таблица умножения GHASH.
+    Длина тега фиксируется в конструкторе и одинакова для шифрования и проверки.
+    """
+
+    def __init__(self, key, tag_length=16):
+        if tag_length not in TAG_LENGTHS:
+            raise ValueError("Длина тега GCM должна быть 16, 15, 14, 13, 12, 8 или 4 байта")
+        self.tag_length = tag_length
+        self.cipher = get_cipher(key)
+        h = int.from_bytes(self.cipher.encrypt_block(bytes(16)), "big")
+        self.table = ghash_table(h)
+
+    def initial_counter(self, iv):
+        # J0: для 96-битного IV - IV || 0^31 || 1, иначе GHASH(IV || дополнение || длина IV).
+        # Пустой IV SP 800-38D не допускает
+        if not iv:
+            raise ValueError("IV для GCM не может быть пустым")
+        if len(iv) == 12:
+            return bytes(iv) + b"\x00\x00\x00\x01"
+        y = ghash(self.table, iv)
+        y = ghash_multiply(y ^ (len(iv) * 8), self.table)
+        return y.to_bytes(16, "big")
+
+    def encryptor(self, iv, aad=b""):
+        return GCMEncryptor(self, iv, aad)
+
+    def decryptor(self, iv, aad=b""):
+        return GCMDecryptor(self, iv, aad)
+
+    def encrypt(self, iv, plaintext, aad=b""):
+        # Возвращает пару (шифртекст, тег)
+        encryptor = self.encryptor(iv, aad)
+        ciphertext = encryptor.update(plaintext)
+        tail, tag = encryptor.finalize()
+        return ciphertext + tail, tag
+
+    def decrypt(self, iv, ciphertext, tag, aad=b""):
+        decryptor = self.decryptor(iv, aad)
+        plaintext = decryptor.update(ciphertext)
+        return plaintext + decryptor.finalize(tag)
+
+
+def aes_encrypt_gcm(plaintext, key, iv, aad=b"", tag_length=16):
+    return AESGCM(key, tag_length).encrypt(iv, plaintext, aad)
+
+
+def aes_decrypt_gcm(ciphertext, key, iv, tag, aad=b"", tag_length=16):
+    return AESGCM(key, tag_length).decrypt(iv, ciphertext, tag, aad)
@@ -0,0 +1,172 @@
+import atexit
+import json
+import os
+import sys
+from contextlib import contextmanager
+from functools import wraps
+from time import perf_counter
+
+import aes
+
+# Инструментирование AES: подсчёт вызовов и суммарного времени по этапам
+# и по функциям режимов. В выключенном состоянии в модулях стоят исходные
+# функции, поэтому накладных расходов нет. Включение подменяет функции
+# обёртками - в модуле aes и во всех загруженных модулях, которые
+# импортировали их через from aes import ...
+#
+# Включается переменной окружения AES_PROFILE=1 (при импорте aes) или
+# контекстным менеджером profiling(). Если задана AES_PROFILE_OUTPUT,
+# при выходе статистика записывается в этот файл в формате JSON.
+# Время вложенных вызовов входит во время внешних (инклюзивный учёт).
+# Рабочие процессы пулов ведут собственную статистику.
+#
+# Рабочий движок построен на T-таблицах: раунды целиком идут внутри
+# encrypt_words/decrypt_words, ключи расширяет key_expansion_words, поэтому
+# sub_bytes, shift_rows, mix_columns и add_round_key в обычной статистике
+# не встречаются (stats() не выводит записи без вызовов). Разбивку по этим
+# этапам даёт profiling(reference=True) или AES_PROFILE=reference:
+# aes_encrypt_block/aes_decrypt_block тогда выполняются пошаговым эталонным
+# движком (aes_*_block_reference). Режимы (ECB, CBC, CTR) по-прежнему
+# работают на T-таблицах.
+
+STAGE_FUNCTIONS = [
+    "key_expansion", "key_expansion_words", "inv_key_expansion_words",
+    "sub_bytes", "shift_rows", "mix_columns", "add_round_key",
+    "inv_sub_bytes", "inv_shift_rows", "encrypt_words", "decrypt_words",
+]
+MODE_FUNCTIONS = [
+    "aes_encrypt_block", "aes_decrypt_block",
+    "aes_encrypt_ecb", "aes_decrypt_ecb",
+    "aes_encrypt_cbc", "aes_decrypt_cbc", "decrypt_cbc_parallel",
+    "aes_encrypt_ctr", "aes_decrypt_ctr",
+]
+REFERENCE_FUNCTIONS = ["aes_encrypt_block", "aes_decrypt_block"]  # Переводятся на эталонный движок при reference=True
+CIPHER_METHODS = [
+    "encrypt_ecb_into", "decrypt_ecb_into",
+    "encrypt_cbc_into", "decrypt_cbc_into", "ctr_xor_into",
+]
+
+STATS = {}  # имя -> [число вызовов, суммарное время в секундах]
+ORIGINALS = {}  # (объект, атрибут) -> исходная функция
+WRAPPERS = {}  # id(обёртка) -> (обёртка, исходная функция) (для модулей, импортированных при включённом профилировании)
+enabled_depth = 0
+environment_checked = False
+
+
+def timed(name, function):
+    record = STATS.setdefault(name, [0, 0.0])
+
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record[0] += 1
+            record[1] += perf_counter() - start
+
+    return wrapper
+
+
+def patch(owner, attribute, replacement):
+    ORIGINALS[(owner, attribute)] = getattr(owner, attribute)
+    setattr(owner, attribute, replacement)
+
+
+def enable(reference=False):
+    # Устанавливает обёртки; повторный вызов только увеличивает счётчик вложенности
+    # (reference учитывается только при первом включении)
+    global enabled_depth
+    enabled_depth += 1
+    if enabled_depth > 1:
+        return
+
+    for name in STAGE_FUNCTIONS + MODE_FUNCTIONS:
+        original = getattr(aes, name)
+        if reference and name in REFERENCE_FUNCTIONS:
+            # Эталонный движок берёт этапы из глобальных имён aes, поэтому
+            # вызовы sub_bytes, mix_columns и т.д. внутри него тоже учитываются
+            wrapper = timed(name, getattr(aes, name + "_reference"))
+        else:
+            wrapper = timed(name, original)
+        WRAPPERS[id(wrapper)] = (wrapper, original)
+        for module in list(sys.modules.values()):
+            if getattr(module, name, None) is original:
+                patch(module, name, wrapper)
+    for name in CIPHER_METHODS:
+        patch(aes.AESCipher, name, timed("AESCipher." + name, getattr(aes.AESCipher, name)))
+
+
+def disable():
+    global enabled_depth
+    if enabled_depth == 0:
+        return
+    enabled_depth -= 1
+    if enabled_depth:
+        return
+    for (owner, attribute), original in ORIGINALS.items():
+        setattr(owner, attribute, original)
+    ORIGINALS.clear()
+    # Модули, загруженные после enable(), получили обёртки через from aes import ...;
+    # их тоже возвращаем к исходным функциям
+    for module in list(sys.modules.values()):
+        for name in STAGE_FUNCTIONS + MODE_FUNCTIONS:
+            wrapper, original = WRAPPERS.get(id(getattr(module, name, None)), (None, None))
+            if wrapper is not None and getattr(module, name) is wrapper:
+                setattr(module, name, original)
+    WRAPPERS.clear()
+
+
+@contextmanager
+def profiling(reset_stats=False, reference=False):
+    # with profiling(): ... - статистика собирается только внутри блока
+    if reset_stats:
+        reset()
+    enable(reference)
+    try:
+        yield STATS
+    finally:
+        disable()
+
+
+def reset():
+    for record in STATS.values():
+        record[0] = 0
+        record[1] = 0.0
+
+
+def stats():
+    # Статистика в виде словаря: {имя: {"calls": ..., "seconds": ...}}
+    return {
+        name: {"calls": calls, "seconds": seconds}
+        for name, (calls, seconds) in sorted(STATS.items())
+        if calls
+    }
+
+
+def export_json(path=None):
+    # Возвращает статистику в JSON; если указан path, ещё и записывает в файл
+    text = json.dumps(stats(), indent=2)
+    if path:
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(text)
+    return text
+
+
+def enable_from_environment():
+    # Проверяет AES_PROFILE один раз за процесс
+    global environment_checked
+    if environment_checked:
+        return
+    environment_checked = True
+    value = os.environ.get("AES_PROFILE", "")
+    if value not in ("", "0"):
+        enable(reference=value == "reference")
+        output = os.environ.get("AES_PROFILE_OUTPUT")
+        if output:
+            atexit.register(export_json, output)
+
+
+# Вызывается здесь, а не из aes: при импорте aes_profile первым модуль aes
+# загружается раньше, чем определены функции этого модуля
+enable_from_environment()
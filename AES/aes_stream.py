@@ -0,0 +1,146 @@
+import mmap
+import os
+
+from aes import get_cipher
+
+# Потоковое шифрование AES: данные подаются частями через update(), а
+# дополнение PKCS#7 добавляется (и проверяется) только в finalize().
+# В отличие от aes_encrypt_cbc, дополнение добавляется всегда, даже если
+# длина данных уже кратна 16, поэтому расшифрование однозначно.
+
+STREAM_CHUNK_SIZE = 1 << 20  # Размер части файла, читаемой за один раз (1 МБ)
+
+
+def pkcs7_pad(data):
+    padding_len = 16 - (len(data) % 16)
+    return bytes(data) + bytes([padding_len] * padding_len)
+
+
+def pkcs7_unpad(data):
+    padding_len = data[-1] if data else 0
+    if not 1 <= padding_len <= 16 or data[-padding_len:] != bytes([padding_len] * padding_len):
+        raise ValueError("Некорректное дополнение PKCS#7")
+    return data[:-padding_len]
+
+
+class CBCEncryptor:
+    """
+    Потоковый шифратор CBC. Между вызовами update() хранит последний блок
+    шифртекста (цепочку) и хвост входных данных короче одного блока.
+    """
+
+    def __init__(self, key, iv):
+        self.cipher = get_cipher(key)
+        self.previous_block = bytes(iv)
+        self.pending = bytearray()
+
+    def update(self, data):
+        self.pending += data
+        full_length = len(self.pending) // 16 * 16
+        if not full_length:
+            return b""
+        out = bytearray(full_length)
+        with memoryview(self.pending) as view:  # Без копирования; освобождаем до изменения размера
+            self.cipher.encrypt_cbc_into(view[:full_length], self.previous_block, out)
+        del self.pending[:full_length]
+        self.previous_block = bytes(out[-16:])
+        return bytes(out)
+
+    def finalize(self):
+        # Дополняет и шифрует остаток; после этого объект использовать нельзя
+        tail = pkcs7_pad(self.pending)
+        out = bytearray(len(tail))
+        self.cipher.encrypt_cbc_into(tail, self.previous_block, out)
+        self.pending = bytearray()
+        return bytes(out)
+
+
+class CBCDecryptor:
+    """
+    Потоковый расшифровщик CBC. Последний полный блок всегда придерживается
+    до finalize(), потому что только в нём можно снять дополнение.
+    """
+
+    def __init__(self, key, iv):
+        self.cipher = get_cipher(key)
+        self.previous_block = bytes(iv)
+        self.pending = bytearray()
+
+    def update(self, data):
+        self.pending += data
+        # Оставляем хотя бы один блок (и неполный хвост) до следующего вызова
+        ready_length = (len(self.pending) - 1) // 16 * 16
+        if ready_length <= 0:
+            return b""
+        out = bytearray(ready_length)
+        with memoryview(self.pending) as view:
+            self.cipher.decrypt_cbc_into(view[:ready_length], self.previous_block, out)
+        self.previous_block = bytes(self.pending[ready_length - 16:ready_length])
+        del self.pending[:ready_length]
+        return bytes(out)
+
+    def finalize(self):
+        if len(self.pending) != 16:
+            raise ValueError("Длина шифртекста должна быть кратна 16 байтам")
+        out = bytearray(16)
+        self.cipher.decrypt_cbc_into(self.pending, self.previous_block, out)
+        self.pending = bytearray()
+        return pkcs7_unpad(bytes(out))
+
+
+class CTRStream:
+    """
+    Потоковый режим CTR: дополнение не нужно, состояние - смещение в потоке.
+    Одинаково подходит для шифрования и расшифрования.
+    """
+
+    def __init__(self, key, initial_counter, offset=0):
+        self.cipher = get_cipher(key)
+        self.initial_counter = bytes(initial_counter)
+        self.offset = offset
+
+    def update(self, data):
+        out = bytearray(len(data))
+        self.cipher.ctr_xor_into(data, self.initial_counter, out, self.offset)
+        self.offset += len(data)
+        return bytes(out)
+
+    def finalize(self):
+        return b""
+
+
+def read_chunks(path, chunk_size=STREAM_CHUNK_SIZE, use_mmap=False):
+    # Читает файл частями фиксированного размера; при use_mmap файл отображается
+    # в память и части берутся срезами отображения
+    with open(path, "rb") as file:
+        if use_mmap and os.fstat(file.fileno()).st_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for start in range(0, len(mapped), chunk_size):
+                    yield mapped[start:start + chunk_size]
+        else:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+def process_file(stream, source_path, destination_path, chunk_size=STREAM_CHUNK_SIZE, use_mmap=False):
+    # Прогоняет файл через потоковый объект; в памяти одновременно не больше одной части
+    with open(destination_path, "wb") as destination:
+        for chunk in read_chunks(source_path, chunk_size, use_mmap):
+            destination.write(stream.update(chunk))
+        destination.write(stream.finalize())
+
+
+def encrypt_file_cbc(source_path, destination_path, key, iv, chunk_size=STREAM_CHUNK_SIZE, use_mmap=False):
+    process_file(CBCEncryptor(key, iv), source_path, destination_path, chunk_size, use_mmap)
+
+
+def decrypt_file_cbc(source_path, destination_path, key, iv, chunk_size=STREAM_CHUNK_SIZE, use_mmap=False):
+    process_file(CBCDecryptor(key, iv), source_path, destination_path, chunk_size, use_mmap)
+
+
+def crypt_file_ctr(source_path, destination_path, key, initial_counter, chunk_size=STREAM_CHUNK_SIZE, use_mmap=False):
+    # В CTR шифрование и расшифрование совпадают
+    process_file(CTRStream(key, initial_counter), source_path, destination_path, chunk_size, use_mmap)
@@ -0,0 +1,197 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from struct import pack_into, unpack_from
+
+from aes import get_cipher, encrypt_words, decrypt_words, PARALLEL_THRESHOLD
+
+# Режим XTS-AES (IEEE 1619, NIST SP 800-38E) для хранилищ с адресацией по секторам.
+# Каждый сектор шифруется независимо: твик сектора T = E_K2(номер сектора), для
+# блока j используется T * alpha^j в GF(2^128). Поэтому любой сектор можно
+# перешифровать, не трогая соседние.
+
+SECTOR_SIZE = 4096  # Размер сектора (единицы данных) по умолчанию
+MASK_128 = (1 << 128) - 1
+
+
+def multiply_alpha(tweak):
+    # Умножение твика на alpha (x) в GF(2^128); твик - число в порядке little-endian
+    tweak <<= 1
+    if tweak >> 128:
+        tweak = (tweak & MASK_128) ^ 0x87
+    return tweak
+
+
+def tweak_words(tweak):
+    # Твик в виде четырёх 32-битных слов, как их читает unpack_from(">4I", ...)
+    return unpack_from(">4I", tweak.to_bytes(16, "little"))
+
+
+class AESXTS:
+    """
+    XTS-AES. Ключ - это два ключа AES одинаковой длины подряд (K1 || K2):
+    K1 шифрует данные, K2 - номера секторов.
+    """
+
+    def __init__(self, key, sector_size=SECTOR_SIZE):
+        if len(key) not in (32, 64):
+            raise ValueError("Ключ XTS-AES должен быть длиной 32 (AES-128) или 64 (AES-256) байта")
+        if sector_size < 16:
+            raise ValueError("Сектор должен быть не короче одного блока")
+        half = len(key) // 2
+        if key[:half] == key[half:]:
+            raise ValueError("Половины ключа XTS должны различаться")
+        self.key = bytes(key)
+        self.sector_size = sector_size
+        self.data_cipher = get_cipher(key[:half])
+        self.tweak_cipher = get_cipher(key[half:])
+
+    def sector_tweaks(self, sector_number, n_blocks):
+        # Все твики сектора считаются заранее одним проходом: T_0 = E_K2(i), T_(j+1) = T_j * alpha
+        tweak = int.from_bytes(self.tweak_cipher.encrypt_block(sector_number.to_bytes(16, "little")), "little")
+        tweaks = []
+        for _ in range(n_blocks):
+            tweaks.append(tweak_words(tweak))
+            tweak = multiply_alpha(tweak)
+        return tweaks
+
+    def crypt_sector(self, sector_number, buffer, offset, length, encrypting):
+        # Шифрует или расшифровывает сектор buffer[offset:offset + length] на месте.
+        # buffer - любой записываемый буфер (bytearray, mmap). Если длина не кратна 16,
+        # применяется кража шифртекста (ciphertext stealing)
+        if length < 16:
+            raise ValueError("Сектор должен быть не короче одного блока")
+        cipher = self.data_cipher
+        if encrypting:
+            words, rk = encrypt_words, cipher.round_words
+        else:
+            words, rk = decrypt_words, cipher.inv_round_words
+        full_blocks, tail = divmod(length, 16)
+        tweaks = self.sector_tweaks(sector_number, full_blocks + (1 if tail else 0))
+
+        # Блоки, которые обрабатываются обычным образом (без кражи шифртекста)
+        plain_blocks = full_blocks - 1 if tail else full_blocks
+        for j in range(plain_blocks):
+            position = offset + j * 16
+            t0, t1, t2, t3 = tweaks[j]
+            d0, d1, d2, d3 = unpack_from(">4I", buffer, position)
+            s0, s1, s2, s3 = words(d0 ^ t0, d1 ^ t1, d2 ^ t2, d3 ^ t3, rk)
+            pack_into(">4I", buffer, position, s0 ^ t0, s1 ^ t1, s2 ^ t2, s3 ^ t3)
+
+        if tail:
+            self.steal_ciphertext(buffer, offset + plain_blocks * 16, tail, tweaks[plain_blocks:], words, rk, encrypting)
+
+    def steal_ciphertext(self, buffer, position, tail, tweaks, words, rk, encrypting):
+        # Последний полный блок и неполный хвост. При шифровании сначала используется
+        # твик T_(m-1), затем T_m; при расшифровании - в обратном порядке
+        first_tweak, second_tweak = (tweaks[0], tweaks[1]) if encrypting else (tweaks[1], tweaks[0])
+
+        def crypt_block(block, tweak):
+            d0, d1, d2, d3 = unpack_from(">4I", block)
+            t0, t1, t2, t3 = tweak
+            s0, s1, s2, s3 = words(d0 ^ t0, d1 ^ t1, d2 ^ t2, d3 ^ t3, rk)
+            out = bytearray(16)
+            pack_into(">4I", out, 0, s0 ^ t0, s1 ^ t1, s2 ^ t2, s3 ^ t3)
+            return out
+
+        last_full = crypt_block(buffer[position:position + 16], first_tweak)
+        stolen = bytes(buffer[position + 16:position + 16 + tail])
+        buffer[position + 16:position + 16 + tail] = last_full[:tail]
+        buffer[position:position + 16] = crypt_block(stolen + last_full[tail:], second_tweak)
+
+    def encrypt_sector(self, sector_number, data):
+        buffer = bytearray(data)
+        self.crypt_sector(sector_number, buffer, 0, len(buffer), True)
+        return bytes(buffer)
+
+    def decrypt_sector(self, sector_number, data):
+        buffer = bytearray(data)
+        self.crypt_sector(sector_number, buffer, 0, len(buffer), False)
+        return bytes(buffer)
+
+    def crypt_sectors(self, buffer, first_sector, start, end, encrypting, base_offset=0):
+        # Обрабатывает на месте сектора с индексами [start, end) внутри buffer;
+        # номер сектора для твика - first_sector + индекс
+        for index in range(start, end):
+            offset = base_offset + index * self.sector_size
+            length = min(self.sector_size, len(buffer) - offset)
+            self.crypt_sector(first_sector + index, buffer, offset, length, encrypting)
+
+    def encrypt(self, data, first_sector=0):
+        # Шифрует буфер, состоящий из подряд идущих секторов
+        buffer = bytearray(data)
+        self.crypt_sectors(buffer, first_sector, 0, sector_count(len(buffer), self.sector_size), True)
+        return bytes(buffer)
+
+    def decrypt(self, data, first_sector=0):
+        buffer = bytearray(data)
+        self.crypt_sectors(buffer, first_sector, 0, sector_count(len(buffer), self.sector_size), False)
+        return bytes(buffer)
+
+
+def sector_count(length, sector_size):
+    return (length + sector_size - 1) // sector_size
+
+
+def xts_file_worker(path, key, sector_size, first_sector, start, end, encrypting):
+    # Выполняется в рабочем процессе: отображает файл в память и обрабатывает
+    # сектора [start, end) на месте. Между процессами передаются только границы
+    xts = AESXTS(key, sector_size)
+    with open(path, "r+b") as file, mmap.mmap(file.fileno(), 0) as mapped:
+        xts.crypt_sectors(mapped, first_sector, start, end, encrypting)
+        mapped.flush()
+
+
+def crypt_file_inplace(path, key, encrypting, sector_size=SECTOR_SIZE, first_sector=0, workers=None):
+    size = os.path.getsize(path)
+    if size % sector_size and size % sector_size < 16:
+        raise ValueError("Последний сектор файла короче одного блока")
+    total = sector_count(size, sector_size)
+    if not total:
+        return
+    if workers == 1 or size < PARALLEL_THRESHOLD:
+        xts_file_worker(path, key, sector_size, first_sector, 0, total, encrypting)
+        return
+
+    # Диапазоны секторов раздаются процессам; каждый процесс сам отображает файл
+    workers = workers or os.cpu_count() or 1
+    step = max(1, sector_count(total, workers * 4))
+    ranges = [(start, min(start + step, total)) for start in range(0, total, step)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(xts_file_worker, path, bytes(key), sector_size, first_sector, start, end, encrypting)
+            for start, end in ranges
+        ]
+        for future in futures:
+            future.result()
+
+
+def encrypt_file_inplace(path, key, sector_size=SECTOR_SIZE, first_sector=0, workers=None):
+    crypt_file_inplace(path, key, True, sector_size, first_sector, workers)
+
+
+def decrypt_file_inplace(path, key, sector_size=SECTOR_SIZE, first_sector=0, workers=None):
+    crypt_file_inplace(path, key, False, sector_size, first_sector, workers)
+
+
+def read_sector(path, key, index, sector_size=SECTOR_SIZE, first_sector=0):
+    # Читает и расшифровывает один сектор файла
+    with open(path, "rb") as file:
+        file.seek(index * sector_size)
+        data = file.read(sector_size)
+    return AESXTS(key, sector_size).decrypt_sector(first_sector + index, data)
+
+
+def write_sector(path, key, index, plaintext, sector_size=SECTOR_SIZE, first_sector=0):
+    # Шифрует и записывает один сектор; соседние сектора не читаются и не перешифровываются.
+    # Сектор должен уже существовать в файле, а длина данных - совпадать с его длиной
+    # (полный сектор или последний неполный), иначе файл перестанет расшифровываться
+    size = os.path.getsize(path)
+    if not 0 <= index < sector_count(size, sector_size):
+        raise ValueError("Номер сектора за пределами файла")
+    if len(plaintext) != min(sector_size, size - index * sector_size):
+        raise ValueError("Длина данных не совпадает с длиной сектора")
+    ciphertext = AESXTS(key, sector_size).encrypt_sector(first_sector + index, plaintext)
+    with open(path, "r+b") as file:
+        file.seek(index * sector_size)
+        file.write(ciphertext)
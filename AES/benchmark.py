@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from aes import (
+    AESCipher, key_expansion,
+    aes_encrypt_block_reference, aes_decrypt_block_reference
+)
+
+# Набор бенчмарков AES: пропускная способность (МБ/с) и задержка на блок для
+# ECB/CBC на разных размерах сообщений и движках, плюс стоимость расширения ключа.
+# Перед замерами проверяются известные ответы FIPS-197; с --output результаты
+# пишутся в JSON, чтобы сравнивать их между версиями (без него файл не создаётся).
+#
+# Пример: python benchmark.py --max-size 4M --output bench.json
+
+# Известные ответы FIPS-197 (приложение B и C.1-C.3): (ключ, открытый текст, шифртекст)
+KNOWN_ANSWERS = [
+    ("2b7e151628aed2a6abf7158809cf4f3c", "3243f6a8885a308d313198a2e0370734", "3925841d02dc09fbdc118597196a0b32"),
+    ("000102030405060708090a0b0c0d0e0f", "00112233445566778899aabbccddeeff", "69c4e0d86a7b0430d8cdb78070b4c55a"),
+    ("000102030405060708090a0b0c0d0e0f1011121314151617",
+     "00112233445566778899aabbccddeeff", "dda97ca4864cdfe06eaf70a0ec0d7191"),
+    ("000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f",
+     "00112233445566778899aabbccddeeff", "8ea2b7ca516745bfeafc49904b496089"),
+]
+
+SIZES = [16, 256, 4 << 10, 64 << 10, 1 << 20, 16 << 20, 64 << 20]
+MIN_TIME = 0.2  # Минимальная длительность одного замера в секундах
+
+
+def parse_size(text):
+    # "64K", "4M", "1024" -> число байт
+    multipliers = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper()
+    if text and text[-1] in multipliers:
+        return int(text[:-1]) * multipliers[text[-1]]
+    return int(text)
+
+
+def check_known_answers():
+    # Проверка всех движков на векторах FIPS-197; возвращает список ошибок
+    failures = []
+    for key_hex, plain_hex, cipher_hex in KNOWN_ANSWERS:
+        key, plaintext, expected = bytes.fromhex(key_hex), bytes.fromhex(plain_hex), bytes.fromhex(cipher_hex)
+        results = {
+            "reference": aes_encrypt_block_reference(plaintext, key),
+            "ttable": AESCipher(key).encrypt_block(plaintext),
+        }
+        for backend, encrypt, _ in optional_backends():
+            results[backend] = encrypt(plaintext, key)
+        for backend, result in results.items():
+            if result != expected:
+                failures.append(f"{backend}: encrypt {key_hex}")
+        if aes_decrypt_block_reference(expected, key) != plaintext or AESCipher(key).decrypt_block(expected) != plaintext:
+            failures.append(f"decrypt {key_hex}")
+    return failures
+
+
+def optional_backends():
+    # Движки, которым нужны дополнительные зависимости: (имя, ECB-шифрование, ECB-расшифрование)
+    backends = []
+    try:
+        from aes_batch import aes_encrypt_ecb_batch, aes_decrypt_ecb_batch
+        backends.append(("numpy", aes_encrypt_ecb_batch, aes_decrypt_ecb_batch))
+    except ImportError:
+        pass
+    from aes_bitslice import aes_encrypt_ecb_bitsliced
+    backends.append(("bitslice", aes_encrypt_ecb_bitsliced, None))
+    return backends
+
+
+def measure(function, min_time=MIN_TIME, repeat=3):
+    # Лучшее среднее время одного вызова из repeat серий длительностью не меньше min_time
+    best = None
+    for _ in range(repeat):
+        calls = 0
+        start = time.perf_counter()
+        while True:
+            function()
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        per_call = elapsed / calls
+        best = per_call if best is None else min(best, per_call)
+    return best
+
+
+def benchmark_cases(key, iv):
+    # (движок, режим, операция, функция от данных)
+    cipher = AESCipher(key)
+    cases = [
+        ("ttable", "ecb", "encrypt", cipher.encrypt_ecb),
+        ("ttable", "ecb", "decrypt", cipher.decrypt_ecb),
+        ("ttable", "cbc", "encrypt", lambda data: cipher.encrypt_cbc(data, iv)),
+        ("ttable", "cbc", "decrypt", lambda data: cipher.decrypt_cbc(data, iv)),
+    ]
+    for backend, encrypt, decrypt in optional_backends():
+        cases.append((backend, "ecb", "encrypt", lambda data, f=encrypt: f(data, key)))
+        if decrypt:
+            cases.append((backend, "ecb", "decrypt", lambda data, f=decrypt: f(data, key)))
+    try:
+        from aes_batch import aes_decrypt_cbc_batch
+        cases.append(("numpy", "cbc", "decrypt", lambda data: aes_decrypt_cbc_batch(data, key, iv)))
+    except ImportError:
+        pass
+    return cases
+
+
+def run(max_size, repeat, min_time, key_bits_list=(128, 192, 256)):
+    iv = bytes(16)
+    report = {
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "key_setup": {},
+        "results": [],
+    }
+
+    for key_bits in key_bits_list:
+        key = bytes(range(key_bits // 8))
+
+        # Стоимость подготовки ключа
+        report["key_setup"][str(key_bits)] = {
+            "key_expansion_us": measure(lambda: key_expansion(key), min_time, repeat) * 1e6,
+            "aes_cipher_us": measure(lambda: AESCipher(key), min_time, repeat) * 1e6,
+            "reference_block_us": measure(lambda: aes_encrypt_block_reference(bytes(16), key), min_time, repeat) * 1e6,
+        }
+        run_sizes(report, key, key_bits, iv, max_size, repeat, min_time)
+    return report
+
+
+def run_sizes(report, key, key_bits, iv, max_size, repeat, min_time):
+    for size in [size for size in SIZES if size <= max_size]:
+        data = os.urandom(size)
+        for backend, mode, operation, function in benchmark_cases(key, iv):
+            seconds = measure(lambda: function(data), min_time, repeat)
+            result = {
+                "key_bits": key_bits,
+                "backend": backend,
+                "mode": mode,
+                "operation": operation,
+                "size": size,
+                "seconds": seconds,
+                "mb_per_s": size / seconds / 1e6,
+                "block_latency_us": seconds / (size // 16) * 1e6,
+            }
+            report["results"].append(result)
+            print(f"AES-{key_bits} {backend:9} {mode} {operation:7} {size:>10} B  "
+                  f"{result['mb_per_s']:8.3f} MB/s  {result['block_latency_us']:8.2f} us/block")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки AES")
+    parser.add_argument("--max-size", default="1M", help="максимальный размер сообщения (до 64M)")
+    parser.add_argument("--repeat", type=int, default=3, help="число серий на замер")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME, help="минимальная длительность серии, с")
+    parser.add_argument("--key-sizes", default="128,192,256", help="размеры ключа в битах через запятую")
+    parser.add_argument("--output", help="файл для результатов в JSON (по умолчанию не записывается)")
+    args = parser.parse_args()
+
+    failures = check_known_answers()
+    if failures:
+        print("Known-answer tests FAILED:", ", ".join(failures))
+        sys.exit(1)
+    print("Known-answer tests: OK")
+
+    key_bits_list = [int(bits) for bits in args.key_sizes.split(",")]
+    report = run(parse_size(args.max_size), args.repeat, args.min_time, key_bits_list)
+    report["kat"] = "ok"
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
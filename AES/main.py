@@ -1,7 +1,55 @@
+import os
+import time
+
 from aes import (
     aes_encrypt_cbc, aes_decrypt_cbc,
     aes_encrypt_ecb, aes_decrypt_ecb
 )
+from aes_cmac import aes_cmac, aes_cmac_batch
+from aes_gcm import AESGCM, gf128_multiply, ghash_multiply, ghash_table
+
+# Тестовые векторы GCM из спецификации McGrew-Viega / NIST (Test Case 2, 3, 4, 6)
+GCM_PLAINTEXT = bytes.fromhex(
+    "d9313225f88406e5a55909c5aff5269a86a7a9531534f7da2e4c303d8a318a72"
+    "1c3c0c95956809532fcf0e2449a6b525b16aedf5aa0de657ba637b391aafd255"
+)
+GCM_CIPHERTEXT = bytes.fromhex(
+    "42831ec2217774244b7221b784d0d49ce3aa212f2c02a4e035c17e2329aca12e"
+    "21d514b25466931c7d8f6a5aac84aa051ba30b396a0aac973d58e091473f5985"
+)
+GCM_KEY = bytes.fromhex("feffe9928665731c6d6a8f9467308308")
+GCM_AAD = bytes.fromhex("feedfacedeadbeeffeedfacedeadbeefabaddad2")
+GCM_LONG_IV = bytes.fromhex(
+    "9313225df88406e555909c5aff5269aa6a7a9538534f7da1e4c303d2a318a728"
+    "c3c0c95156809539fcf0e2429a6b525416aedbf5a0de6a57a637b39b"
+)
+GCM_VECTORS = [
+    # (ключ, IV, открытый текст, AAD, шифртекст, тег)
+    (bytes(16), bytes(12), bytes(16), b"",
+     bytes.fromhex("0388dace60b6a392f328c2b971b2fe78"), bytes.fromhex("ab6e47d42cec13bdf53a67b21257bddf")),
+    (GCM_KEY, bytes.fromhex("cafebabefacedbaddecaf888"), GCM_PLAINTEXT, b"",
+     GCM_CIPHERTEXT, bytes.fromhex("4d5c2af327cd64a62cf35abd2ba6fab4")),
+    (GCM_KEY, bytes.fromhex("cafebabefacedbaddecaf888"), GCM_PLAINTEXT[:60], GCM_AAD,
+     GCM_CIPHERTEXT[:60], bytes.fromhex("5bc94fbc3221a5db94fae95ae7121a47")),
+    (GCM_KEY, GCM_LONG_IV, GCM_PLAINTEXT[:60], GCM_AAD,
+     bytes.fromhex(
+         "8ce24998625615b603a033aca13fb894be9112a5c3a211a8ba262a3cca7e2ca7"
+         "01e4a9a4fba43c90ccdcb281d48c7c6fd62875d2aca417034c34aee5"
+     ), bytes.fromhex("619cc5aefffe0bfa462af43c1699d050")),
+]
+
+# Тестовые векторы AES-CMAC из RFC 4493 (длина сообщения, ожидаемый тег)
+CMAC_KEY = bytes.fromhex("2b7e151628aed2a6abf7158809cf4f3c")
+CMAC_MESSAGE = bytes.fromhex(
+    "6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51"
+    "30c81c46a35ce411e5fbc1191a0a52eff69f2445df4f9b17ad2b417be66c3710"
+)
+CMAC_VECTORS = [
+    (0, bytes.fromhex("bb1d6929e95937287fa37d129b756746")),
+    (16, bytes.fromhex("070a16b46b4d4144f79bdd9dd04a287c")),
+    (40, bytes.fromhex("dfa66747de9ae63030ca32611497c827")),
+    (64, bytes.fromhex("51f0bebf7e3b9d92fc49741779363cfe")),
+]
 
 def first_example():
     plaintext = bytes.fromhex("00112233445566778899aabbccddeeff")
@@ -45,12 +93,56 @@ def my_example():
     decrypted_ecb = aes_decrypt_ecb(ciphertext_ecb, key)
     print("ECB Decrypted:", decrypted_ecb.decode())
 
+
+def gcm_example():
+    for number, (key, iv, plaintext, aad, ciphertext, tag) in enumerate(GCM_VECTORS, 1):
+        gcm = AESGCM(key)
+        result = gcm.encrypt(iv, plaintext, aad)
+        decrypted = gcm.decrypt(iv, ciphertext, tag, aad)
+        status = "OK" if result == (ciphertext, tag) and decrypted == plaintext else "FAIL"
+        print(f"GCM vector {number}: {status}")
+
+
+def ghash_table_example(count=100):
+    # Табличное умножение GHASH против побитового (алгоритм 1 из SP 800-38D)
+    ok = True
+    for _ in range(count):
+        h = int.from_bytes(os.urandom(16), "big")
+        x = int.from_bytes(os.urandom(16), "big")
+        ok = ok and ghash_multiply(x, ghash_table(h)) == gf128_multiply(x, h)
+    print(f"GHASH table multiply: {'OK' if ok else 'FAIL'}")
+
+
+def cmac_example():
+    messages = [CMAC_MESSAGE[:length] for length, _ in CMAC_VECTORS]
+    batch = aes_cmac_batch(CMAC_KEY, messages)
+    for (length, tag), message, batch_tag in zip(CMAC_VECTORS, messages, batch):
+        status = "OK" if aes_cmac(message, CMAC_KEY) == tag == batch_tag else "FAIL"
+        print(f"CMAC vector ({length} bytes): {status}")
+
+
+def gcm_benchmark(size=1 << 18):
+    # Пропускная способность AES-GCM (CTR + GHASH за один проход)
+    gcm = AESGCM(os.urandom(16))
+    data = os.urandom(size)
+    start = time.perf_counter()
+    gcm.encrypt(os.urandom(12), data)
+    elapsed = time.perf_counter() - start
+    print(f"GCM throughput: {size / elapsed / 1e6:.2f} MB/s")
+
+
 def main():
     first_example()
     print()
     second_example()
     print()
     my_example()
+    print()
+    gcm_example()
+    ghash_table_example()
+    gcm_benchmark()
+    print()
+    cmac_example()
 
 if __name__ == "__main__":
     main()
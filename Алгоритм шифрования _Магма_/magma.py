@@ -0,0 +1,448 @@
+# Блочный шифр Магма (ГОСТ 28147-89, ГОСТ Р 34.12-2015): блок 64 бита, ключ 256 бит.
+# Модуль можно импортировать: при импорте ничего не читается и не пишется.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from struct import pack, pack_into, unpack, unpack_from
+
+BLOCK_SIZE = 8  # Размер блока в байтах
+MASK_64 = (1 << 64) - 1
+
+def pad(data): # Функция для дополнения (процедура 2 ГОСТ Р 34.13-2015)
+    # Байт 0x80 и нули до длины, кратной 8. Дополнение добавляется всегда,
+    # поэтому снимается однозначно для любых двоичных данных
+    return bytes(data) + b'\x80' + bytes(-(len(data) + 1) % BLOCK_SIZE)
+
+def unpad(data): # Функция для снятия дополнения
+    stripped = bytes(data).rstrip(b'\x00')
+    if not stripped or stripped[-1] != 0x80 or len(data) - len(stripped) >= BLOCK_SIZE:
+        raise ValueError("Некорректное дополнение")
+    return stripped[:-1]
+
+def bytes_to_blocks(data): # Функция для преобразования байтов в 64-битные блоки
+    # Длина должна быть кратна 8; каждые 8 байт - одно число (big-endian)
+    if len(data) % BLOCK_SIZE:
+        raise ValueError("Длина данных должна быть кратна 8 байтам")
+    return list(unpack(f'>{len(data) // BLOCK_SIZE}Q', data))
+
+def blocks_to_bytes(blocks): # Функция для преобразования 64-битных блоков в байты
+    return pack(f'>{len(blocks)}Q', *blocks)
+
+def sbox_transform(value): # Функция для применения s-box
+    result = 0
+    for i in range(8): # Разбиваем 32-битное число на 8 частей по 4 бита
+        part = (value >> (4 * i)) & 0xF # Берем текущие 4 бита
+        transformed_part = S_BOX[i][part] # Применяем соответствующую строку S_BOX
+        result |= transformed_part << (4 * i) # Объединяем обратно в результат
+    return result
+
+def division_into_parts(data): # Функция для разделения исходного блока на 2 части
+    L = (data >> 32) & 0xFFFFFFFF  # Старшие 32 бита
+    R = data & 0xFFFFFFFF  # Младшие 32 бита
+    return L, R
+
+def module_by_add(part, key): # Функция для вычисления сложения по модулю
+    part = (part + key) % (2 ** 32)
+    return part
+
+def cyclic_shift(part): # Функция для циклического сдвига
+    part = ((part << 11) & 0xFFFFFFFF) | (part >> 21)  # Циклический сдвиг на 11 битов
+    return part
+
+def build_round_tables(s_box): # Функция для построения объединённых таблиц раунда
+    # Четыре таблицы по 256 значений: таблица i объединяет строки S-box 2i и 2i+1
+    # (байт i аргумента) и сразу содержит результат, сдвинутый на свою позицию
+    # и циклически сдвинутый на 11 битов. Подстановка и сдвиг раунда
+    # сводятся к четырём выборкам и XOR
+    tables = []
+    for i in range(4):
+        low_row, high_row = s_box[2 * i], s_box[2 * i + 1]
+        table = []
+        for byte in range(256):
+            value = ((high_row[byte >> 4] << 4) | low_row[byte & 0xF]) << (8 * i)
+            table.append(cyclic_shift(value))
+        tables.append(table)
+    return tables
+
+def encryption_magma(data, keys, tables=None): # Функция для шифрования алгоритмом Магма
+    t0, t1, t2, t3 = tables or ROUND_TABLES # Объединённые таблицы для S_BOX
+    L, R = division_into_parts(data) # Делим на 2 части
+
+    for i in range(3): # Первые 24 раунда
+        for j in range(8):
+            x = (R + keys[j]) & 0xFFFFFFFF # Сложение с ключом по модулю
+            # s-box и циклический сдвиг на 11 битов - по таблицам
+            new_R = t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+            new_R ^= L
+
+            L = R
+            R = new_R
+
+    for j in range(7, -1, -1): # Последние 8 раундов
+        x = (R + keys[j]) & 0xFFFFFFFF
+        new_R = t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+        new_R ^= L
+
+        if (j != 0):
+            L = R
+            R = new_R
+        else: # Последний раунд
+            L = new_R
+
+    encrypted_data = (L << 32) | R  # Объединяем в 64-битное число
+    return encrypted_data
+
+def decryption_magma(data, keys, tables=None):
+    t0, t1, t2, t3 = tables or ROUND_TABLES
+    L, R = division_into_parts(data)
+
+    for j in range(8):
+        if (j != 0):
+            x = (L + keys[j]) & 0xFFFFFFFF
+            new_L = t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24] ^ R
+
+            R = L
+            L = new_L
+        else: # первый раунд
+            x = (R + keys[j]) & 0xFFFFFFFF
+            new_L = t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24] ^ L
+
+            L = new_L
+
+    for i in range(3):
+        for j in range(7, -1, -1):
+            x = (L + keys[j]) & 0xFFFFFFFF
+            new_L = t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24] ^ R
+
+            R = L
+            L = new_L
+
+    decrypted_data = (L << 32) | R  # Объединяем в 64-битное число
+    return decrypted_data
+
+S_BOX = [ # id-tc26-gost-28147-param-Z (ГОСТ Р 34.12-2015); строка i - для i-й тетрады, начиная с младшей
+    [0xC, 0x4, 0x6, 0x2, 0xA, 0x5, 0xB, 0x9, 0xE, 0x8, 0xD, 0x7, 0x0, 0x3, 0xF, 0x1],
+    [0x6, 0x8, 0x2, 0x3, 0x9, 0xA, 0x5, 0xC, 0x1, 0xE, 0x4, 0x7, 0xB, 0xD, 0x0, 0xF],
+    [0xB, 0x3, 0x5, 0x8, 0x2, 0xF, 0xA, 0xD, 0xE, 0x1, 0x7, 0x4, 0xC, 0x9, 0x6, 0x0],
+    [0xC, 0x8, 0x2, 0x1, 0xD, 0x4, 0xF, 0x6, 0x7, 0x0, 0xA, 0x5, 0x3, 0xE, 0x9, 0xB],
+    [0x7, 0xF, 0x5, 0xA, 0x8, 0x1, 0x6, 0xD, 0x0, 0x9, 0x3, 0xE, 0xB, 0x4, 0x2, 0xC],
+    [0x5, 0xD, 0xF, 0x6, 0x9, 0x2, 0xC, 0xA, 0xB, 0x7, 0x8, 0x1, 0x4, 0x3, 0xE, 0x0],
+    [0x8, 0xE, 0x2, 0x5, 0x6, 0x9, 0x1, 0xC, 0xF, 0x4, 0xB, 0x0, 0xD, 0xA, 0x3, 0x7],
+    [0x1, 0x7, 0xE, 0xD, 0x0, 0x5, 0x8, 0x3, 0x4, 0xF, 0xA, 0x6, 0x9, 0xC, 0xB, 0x2],
+]
+
+S_BOX_TEST_3411 = [ # id-GostR3411-94-TestParamSet (RFC 4357, RFC 5831)
+    [0x4, 0xA, 0x9, 0x2, 0xD, 0x8, 0x0, 0xE, 0x6, 0xB, 0x1, 0xC, 0x7, 0xF, 0x5, 0x3],
+    [0xE, 0xB, 0x4, 0xC, 0x6, 0xD, 0xF, 0xA, 0x2, 0x3, 0x8, 0x1, 0x0, 0x7, 0x5, 0x9],
+    [0x5, 0x8, 0x1, 0xD, 0xA, 0x3, 0x4, 0x2, 0xE, 0xF, 0xC, 0x7, 0x6, 0x0, 0x9, 0xB],
+    [0x7, 0xD, 0xA, 0x1, 0x0, 0x8, 0x9, 0xF, 0xE, 0x4, 0x6, 0xC, 0xB, 0x2, 0x5, 0x3],
+    [0x6, 0xC, 0x7, 0x1, 0x5, 0xF, 0xD, 0x8, 0x4, 0xA, 0x9, 0xE, 0x0, 0x3, 0xB, 0x2],
+    [0x4, 0xB, 0xA, 0x0, 0x7, 0x2, 0x1, 0xD, 0x3, 0x6, 0x8, 0x5, 0x9, 0xC, 0xF, 0xE],
+    [0xD, 0xB, 0x4, 0x1, 0x3, 0xF, 0x5, 0x9, 0x0, 0xA, 0xE, 0x7, 0x6, 0x8, 0x2, 0xC],
+    [0x1, 0xF, 0xD, 0x0, 0x5, 0x7, 0xA, 0x4, 0x9, 0x2, 0x3, 0xE, 0x6, 0xB, 0x8, 0xC],
+]
+
+S_BOX_CRYPTOPRO_3411 = [ # id-GostR3411-94-CryptoProParamSet (RFC 4357)
+    [0xA, 0x4, 0x5, 0x6, 0x8, 0x1, 0x3, 0x7, 0xD, 0xC, 0xE, 0x0, 0x9, 0x2, 0xB, 0xF],
+    [0x5, 0xF, 0x4, 0x0, 0x2, 0xD, 0xB, 0x9, 0x1, 0x7, 0x6, 0x3, 0xC, 0xE, 0xA, 0x8],
+    [0x7, 0xF, 0xC, 0xE, 0x9, 0x4, 0x1, 0x0, 0x3, 0xB, 0x5, 0x2, 0x6, 0xA, 0x8, 0xD],
+    [0x4, 0xA, 0x7, 0xC, 0x0, 0xF, 0x2, 0x8, 0xE, 0x1, 0x6, 0x5, 0xD, 0xB, 0x9, 0x3],
+    [0x7, 0x6, 0x4, 0xB, 0x9, 0xC, 0x2, 0xA, 0x1, 0x8, 0x0, 0xE, 0xF, 0xD, 0x3, 0x5],
+    [0x7, 0x6, 0x2, 0x4, 0xD, 0x9, 0xF, 0x0, 0xA, 0x1, 0x5, 0xB, 0x8, 0xE, 0xC, 0x3],
+    [0xD, 0xE, 0x4, 0x1, 0x7, 0x0, 0x5, 0xA, 0x3, 0xC, 0x8, 0xF, 0x6, 0x2, 0x9, 0xB],
+    [0x1, 0x3, 0xA, 0x9, 0x5, 0xB, 0x4, 0xF, 0x8, 0x6, 0x7, 0xE, 0xD, 0x0, 0x2, 0xC],
+]
+
+DEFAULT_SBOX = 'id-tc26-gost-28147-param-Z'
+
+# Реестр именованных наборов S-box: имя -> набор и имя -> номер (0..255).
+# Номер записывается в заголовок контейнера, по нему набор находится при чтении
+SBOX_SETS = {}
+SBOX_IDS = {}
+
+
+def register_sbox(name, s_box, set_id): # Функция для добавления набора S-box в реестр
+    # Набор - 8 строк, каждая - перестановка чисел 0..15. Имя и номер нельзя
+    # переопределить другим набором: таблицы для него уже могли быть построены,
+    # а контейнеры - записаны
+    s_box = tuple(tuple(row) for row in s_box)
+    if len(s_box) != 8 or any(sorted(row) != list(range(16)) for row in s_box):
+        raise ValueError("Набор S-box - это 8 перестановок чисел 0..15")
+    if not 0 <= set_id <= 255:
+        raise ValueError("Номер набора S-box - от 0 до 255")
+    if SBOX_SETS.get(name, s_box) != s_box or SBOX_IDS.get(name, set_id) != set_id:
+        raise ValueError(f"Набор S-box {name} уже зарегистрирован с другими значениями")
+    if any(other != name and number == set_id for other, number in SBOX_IDS.items()):
+        raise ValueError(f"Номер набора S-box {set_id} уже занят")
+    SBOX_SETS[name] = s_box
+    SBOX_IDS[name] = set_id
+
+def sbox_name(set_id): # Функция для имени набора S-box по его номеру
+    for name, number in SBOX_IDS.items():
+        if number == set_id:
+            return name
+    raise ValueError(f"Неизвестный набор S-box: {set_id}")
+
+register_sbox(DEFAULT_SBOX, S_BOX, 0)
+register_sbox('id-GostR3411-94-TestParamSet', S_BOX_TEST_3411, 1)
+register_sbox('id-GostR3411-94-CryptoProParamSet', S_BOX_CRYPTOPRO_3411, 2)
+
+@lru_cache(maxsize=None)
+def round_tables(name=DEFAULT_SBOX): # Функция для получения объединённых таблиц набора
+    # Таблицы строятся при первом обращении и дальше берутся из кэша
+    if name not in SBOX_SETS:
+        raise ValueError(f"Неизвестный набор S-box: {name}")
+    return build_round_tables(SBOX_SETS[name])
+
+ROUND_TABLES = round_tables(DEFAULT_SBOX) # Таблицы набора по умолчанию
+
+def key_sequence(keys): # Функция для получения ключей всех 32 раундов
+    # K1..K8 три раза подряд, затем K8..K1. Для расшифрования - обратный порядок
+    keys = list(keys)
+    return keys * 3 + keys[::-1]
+
+def crypt_block(data, round_keys, tables=None): # Функция для 32 раундов по готовой последовательности ключей
+    # Все раунды одинаковые (без ветвлений), перестановка половин после
+    # последнего раунда отменяется при сборке результата
+    t0, t1, t2, t3 = tables or ROUND_TABLES
+    L, R = division_into_parts(data)
+    for key in round_keys:
+        x = (R + key) & 0xFFFFFFFF
+        L, R = R, L ^ t0[x & 0xFF] ^ t1[(x >> 8) & 0xFF] ^ t2[(x >> 16) & 0xFF] ^ t3[x >> 24]
+    return (R << 32) | L
+
+def ctr_initial_counter(iv): # Функция для начального значения счётчика CTR
+    # ГОСТ Р 34.13-2015: CTR_1 = IV || 0^32, IV - 32 бита (4 байта или число)
+    if isinstance(iv, int):
+        if not 0 <= iv <= 0xFFFFFFFF:
+            raise ValueError("IV режима гаммирования - 32-битное число")
+        return iv << 32
+    if len(iv) != 4:
+        raise ValueError("IV режима гаммирования должен быть длиной 4 байта")
+    return int.from_bytes(iv, 'big') << 32
+
+def iv_block(iv): # Функция для IV режима CBC: 8 байт или 64-битное число
+    if isinstance(iv, int):
+        if not 0 <= iv <= MASK_64:
+            raise ValueError("IV режима CBC - 64-битное число")
+        return iv
+    if len(iv) != BLOCK_SIZE:
+        raise ValueError("IV режима CBC должен быть длиной 8 байт")
+    return int.from_bytes(iv, 'big')
+
+def check_buffers(data, out):
+    # Проверяет, что данные выровнены по блоку и буфер результата достаточно велик
+    if len(data) % BLOCK_SIZE:
+        raise ValueError("Длина данных должна быть кратна 8 байтам")
+    if len(out) < len(data):
+        raise ValueError("Буфер результата меньше входных данных")
+
+def xor_bytes(first, second):
+    return bytes(a ^ b for a, b in zip(first, second))
+
+def split_key(key): # Функция для разбиения 256-битного ключа на K1..K8
+    # Ключ - 32 байта (K1 - старшие 32 бита) или список из восьми 32-битных чисел
+    if isinstance(key, (bytes, bytearray, memoryview)):
+        if len(key) != 32:
+            raise ValueError("Ключ Магмы должен быть длиной 32 байта")
+        return [int.from_bytes(key[i:i + 4], 'big') for i in range(0, 32, 4)]
+    keys = list(key)
+    if len(keys) != 8 or any(not 0 <= k <= 0xFFFFFFFF for k in keys):
+        raise ValueError("Ключ Магмы - это восемь 32-битных чисел")
+    return keys
+
+
+class MagmaCipher:
+    """
+    Шифр Магма с однократно развёрнутыми ключами раундов.
+
+    Последовательности из 32 ключей для шифрования и расшифрования
+    строятся в конструкторе, блок (64-битное число) проходит через
+    один и тот же цикл без ветвлений. sbox - имя набора из реестра
+    SBOX_SETS; его таблицы общие для всех объектов.
+    """
+
+    def __init__(self, key, sbox=DEFAULT_SBOX):
+        self.keys = split_key(key)
+        self.sbox = sbox
+        self.tables = round_tables(sbox)
+        self.encrypt_keys = key_sequence(self.keys)
+        self.decrypt_keys = self.encrypt_keys[::-1]
+
+    def encrypt_block(self, block):
+        return crypt_block(block, self.encrypt_keys, self.tables)
+
+    def decrypt_block(self, block):
+        return crypt_block(block, self.decrypt_keys, self.tables)
+
+    def encrypt_cbc_into(self, data, iv, out):
+        # Шифрует выровненные по 8 байт данные в заранее выделенный буфер out
+        # (bytearray, memoryview, mmap); блоки читаются и пишутся через unpack_from/pack_into
+        check_buffers(data, out)
+        keys, tables = self.encrypt_keys, self.tables
+        vector = iv_block(iv)
+        for i in range(0, len(data), BLOCK_SIZE):
+            vector = crypt_block(unpack_from('>Q', data, i)[0] ^ vector, keys, tables)
+            pack_into('>Q', out, i, vector)
+        return len(data)
+
+    def decrypt_cbc_into(self, data, iv, out):
+        # Можно расшифровывать на месте (out is data): блок шифртекста
+        # запоминается до того, как на его место будет записан открытый текст
+        check_buffers(data, out)
+        keys, tables = self.decrypt_keys, self.tables
+        vector = iv_block(iv)
+        for i in range(0, len(data), BLOCK_SIZE):
+            block = unpack_from('>Q', data, i)[0]
+            pack_into('>Q', out, i, crypt_block(block, keys, tables) ^ vector)
+            vector = block
+        return len(data)
+
+    def encrypt_cbc(self, plaintext, iv):
+        # Дополнение по процедуре 2 добавляется всегда
+        plaintext = pad(plaintext)
+        ciphertext = bytearray(len(plaintext))  # Один буфер на весь результат
+        self.encrypt_cbc_into(plaintext, iv, ciphertext)
+        return bytes(ciphertext)
+
+    def decrypt_cbc(self, ciphertext, iv):
+        plaintext = bytearray(len(ciphertext))
+        self.decrypt_cbc_into(ciphertext, iv, plaintext)
+        return unpad(plaintext)
+
+    def ctr_xor_into(self, data, iv, out, offset=0):
+        # Режим гаммирования (CTR, ГОСТ Р 34.13-2015): данные XOR'ятся с гаммой
+        # E(CTR_1 + i), счётчик 64-битный. offset - смещение в байтах от начала
+        # потока, поэтому расшифровать можно любой фрагмент, не обрабатывая всё до него
+        if len(out) < len(data):
+            raise ValueError("Буфер результата меньше входных данных")
+        keys, tables = self.encrypt_keys, self.tables
+        counter = ctr_initial_counter(iv) + offset // BLOCK_SIZE
+        skip = offset % BLOCK_SIZE  # Сколько байт гаммы первого блока уже использовано
+        length = len(data)
+        position = 0
+
+        if skip:  # Начало посередине блока
+            take = min(BLOCK_SIZE - skip, length)
+            keystream = crypt_block(counter & MASK_64, keys, tables).to_bytes(BLOCK_SIZE, 'big')
+            out[0:take] = xor_bytes(data[0:take], keystream[skip:skip + take])
+            position = take
+            counter += 1
+
+        full_end = position + (length - position) // BLOCK_SIZE * BLOCK_SIZE
+        for i in range(position, full_end, BLOCK_SIZE):
+            pack_into('>Q', out, i, unpack_from('>Q', data, i)[0] ^ crypt_block(counter & MASK_64, keys, tables))
+            counter += 1
+
+        if full_end < length:  # Неполный последний блок
+            keystream = crypt_block(counter & MASK_64, keys, tables).to_bytes(BLOCK_SIZE, 'big')
+            out[full_end:length] = xor_bytes(data[full_end:length], keystream[:length - full_end])
+        return length
+
+    def encrypt_ctr(self, data, iv, offset=0):
+        out = bytearray(len(data))
+        self.ctr_xor_into(data, iv, out, offset)
+        return bytes(out)
+
+    # В режиме гаммирования расшифрование совпадает с шифрованием
+    decrypt_ctr = encrypt_ctr
+
+
+CIPHER_CACHE_SIZE = 32  # Сколько развёрнутых ключей держать в LRU-кэше
+
+
+@lru_cache(maxsize=CIPHER_CACHE_SIZE)
+def cached_cipher(key, sbox):
+    return MagmaCipher(key, sbox)
+
+def get_cipher(key, sbox=DEFAULT_SBOX):
+    # Повторные вызовы с тем же ключом не разворачивают ключи раундов заново
+    if isinstance(key, (bytes, bytearray, memoryview)):
+        return cached_cipher(bytes(key), sbox)
+    return cached_cipher(tuple(key), sbox)
+
+
+PARALLEL_THRESHOLD = 1 << 16  # Данные короче 64 КБ обрабатываются в текущем процессе
+CHUNK_SIZE = 1 << 15  # Размер части данных (кратен 8), отправляемой в рабочий процесс
+
+
+def split_chunks(length, chunk_size=CHUNK_SIZE):
+    # Границы частей [start, end) для раздачи по процессам
+    return [(start, min(start + chunk_size, length)) for start in range(0, length, chunk_size)]
+
+def ctr_worker(keys, iv, offset, chunk, sbox=DEFAULT_SBOX):
+    # Выполняется в рабочем процессе: обрабатывает одну часть потока гаммирования
+    return get_cipher(keys, sbox).encrypt_ctr(chunk, iv, offset)
+
+def magma_encrypt_ctr(data, key, iv, offset=0, workers=None, sbox=DEFAULT_SBOX):
+    """
+    Шифрует (или расшифровывает) данные в режиме гаммирования.
+
+    :param data: Данные произвольной длины.
+    :param key: Ключ Магмы (32 байта или восемь 32-битных чисел).
+    :param iv: Синхропосылка - 4 байта или 32-битное число.
+    :param offset: Смещение data в байтах от начала потока (для произвольного доступа).
+    :param workers: Число процессов; 1 - без пула, None - по числу ядер.
+    :param sbox: Имя набора S-box из реестра SBOX_SETS.
+    :return: Результат той же длины, что и data.
+    """
+    cipher = get_cipher(key, sbox)
+    if workers == 1 or len(data) < PARALLEL_THRESHOLD:
+        return cipher.encrypt_ctr(data, iv, offset)
+
+    # Гамма для каждой части вычисляется независимо: её счётчик определяется смещением
+    out = bytearray(len(data))
+    chunks = split_chunks(len(data))
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        results = executor.map(
+            ctr_worker,
+            [cipher.keys] * len(chunks),
+            [iv] * len(chunks),
+            [offset + start for start, _ in chunks],
+            [bytes(data[start:end]) for start, end in chunks],
+            [sbox] * len(chunks),
+        )
+        for (start, end), result in zip(chunks, results):
+            out[start:end] = result
+    return bytes(out)
+
+def magma_decrypt_ctr(data, key, iv, offset=0, workers=None, sbox=DEFAULT_SBOX):
+    return magma_encrypt_ctr(data, key, iv, offset, workers, sbox)
+
+def magma_encrypt_cbc(plaintext, key, iv, sbox=DEFAULT_SBOX):
+    return get_cipher(key, sbox).encrypt_cbc(plaintext, iv)
+
+def magma_decrypt_cbc(ciphertext, key, iv, workers=None, sbox=DEFAULT_SBOX):
+    if workers == 1 or len(ciphertext) < PARALLEL_THRESHOLD:
+        return get_cipher(key, sbox).decrypt_cbc(ciphertext, iv)
+    return unpad(decrypt_cbc_parallel(ciphertext, key, iv, workers, sbox))
+
+def cbc_decrypt_worker(keys, previous_block, chunk, sbox=DEFAULT_SBOX):
+    # Выполняется в рабочем процессе: расшифровывает часть CBC,
+    # где previous_block - последний блок шифртекста перед частью (или IV)
+    out = bytearray(len(chunk))
+    get_cipher(keys, sbox).decrypt_cbc_into(chunk, previous_block, out)
+    return out
+
+def decrypt_cbc_parallel(ciphertext, key, iv, workers=None, sbox=DEFAULT_SBOX):
+    # Расшифрование CBC не имеет цепной зависимости: P[i] = D(C[i]) ^ C[i-1].
+    # Шифртекст делится на части с перекрытием в один блок (последний блок
+    # предыдущей части служит IV), части расшифровываются в пуле процессов.
+    # Дополнение не снимается
+    check_buffers(ciphertext, ciphertext)
+    keys = split_key(key)
+    out = bytearray(len(ciphertext))
+    chunks = split_chunks(len(ciphertext))
+    previous_blocks = [iv_block(iv)] + [bytes(ciphertext[start - BLOCK_SIZE:start]) for start, _ in chunks[1:]]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        results = executor.map(
+            cbc_decrypt_worker,
+            [keys] * len(chunks),
+            previous_blocks,
+            [bytes(ciphertext[start:end]) for start, end in chunks],
+            [sbox] * len(chunks),
+        )
+        for (start, end), result in zip(chunks, results):
+            out[start:end] = result
+    return bytes(out)
@@ -0,0 +1,112 @@
+from functools import lru_cache
+
+import numpy as np
+
+from magma import DEFAULT_SBOX, BLOCK_SIZE, round_tables, MASK_64, key_sequence, split_key, ctr_initial_counter
+
+# Векторизованный движок Магмы: N блоков хранятся как два массива uint32
+# (левые и правые половины), каждый из 32 раундов выполняется сразу для всего
+# пакета. Сложение с ключом - переполнение uint32, подстановка и сдвиг на 11 -
+# выборка из объединённых таблиц (build_round_tables в magma.py). Для пакета
+# пары байтовых таблиц сливаются в две таблицы по 65536 значений (по 256 КБ):
+# на раунд две выборки вместо четырёх.
+
+BATCH_BLOCKS = 8192  # Сколько блоков обрабатывать за один проход (64 КБ данных)
+
+
+@lru_cache(maxsize=None)
+def tables_array(sbox=DEFAULT_SBOX):
+    # Две таблицы по 16-битной половине аргумента: low[x & 0xFFFF] = T0 ^ T1,
+    # high[x >> 16] = T2 ^ T3 (индекс - старший байт * 256 + младший).
+    # Строятся при первом обращении к набору и дальше берутся из кэша
+    t0, t1, t2, t3 = np.array(round_tables(sbox), dtype=np.uint32)
+    low = (t1[:, None] ^ t0[None, :]).ravel()
+    high = (t3[:, None] ^ t2[None, :]).ravel()
+    return low, high
+
+TABLES = tables_array()  # Таблицы набора по умолчанию
+
+
+def round_keys_array(key, decrypt=False):
+    # Последовательность из 32 ключей раундов как массив uint32
+    keys = key_sequence(split_key(key))
+    return np.array(keys[::-1] if decrypt else keys, dtype=np.uint32)
+
+
+def bytes_to_blocks(data):
+    # Байты -> массив 64-битных блоков (big-endian, как в magma.bytes_to_blocks)
+    if len(data) % BLOCK_SIZE:
+        raise ValueError("Длина данных должна быть кратна 8 байтам")
+    return np.frombuffer(data, dtype=">u8").astype(np.uint64)
+
+
+def blocks_to_bytes(blocks):
+    return blocks.astype(">u8").tobytes()
+
+
+def crypt_blocks(blocks, round_keys, tables=TABLES):
+    # 32 раунда над массивом блоков uint64; порядок round_keys задаёт направление
+    low, high = tables
+    left = (blocks >> np.uint64(32)).astype(np.uint32)
+    right = (blocks & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+    # Промежуточные массивы выделяются один раз и переиспользуются во всех раундах
+    x, f, g = np.empty_like(right), np.empty_like(right), np.empty_like(right)
+    for key in round_keys:
+        np.add(right, key, out=x)  # Сложение по модулю 2^32 (переполнение uint32)
+        np.bitwise_and(x, 0xFFFF, out=g)
+        np.take(low, g, out=f)
+        np.right_shift(x, 16, out=x)
+        np.take(high, x, out=g)
+        f ^= g
+        f ^= left
+        left, right, f = right, f, left  # Освободившийся массив левой половины - под следующий раунд
+    # После последнего раунда половины не переставляются
+    return (right.astype(np.uint64) << np.uint64(32)) | left.astype(np.uint64)
+
+
+def process_in_batches(blocks, round_keys, out, tables=TABLES):
+    # Прогоняет блоки частями по BATCH_BLOCKS, чтобы промежуточные массивы
+    # не разрастались на больших буферах
+    for i in range(0, len(blocks), BATCH_BLOCKS):
+        out[i:i + BATCH_BLOCKS] = crypt_blocks(blocks[i:i + BATCH_BLOCKS], round_keys, tables)
+    return out
+
+
+def magma_encrypt_ecb_batch(plaintext, key, sbox=DEFAULT_SBOX):
+    # Данные должны быть выровнены по 8 байт (дополнение - magma.pad)
+    blocks = bytes_to_blocks(plaintext)
+    out = np.empty_like(blocks)
+    return blocks_to_bytes(process_in_batches(blocks, round_keys_array(key), out, tables_array(sbox)))
+
+
+def magma_decrypt_ecb_batch(ciphertext, key, sbox=DEFAULT_SBOX):
+    blocks = bytes_to_blocks(ciphertext)
+    out = np.empty_like(blocks)
+    return blocks_to_bytes(process_in_batches(blocks, round_keys_array(key, decrypt=True), out, tables_array(sbox)))
+
+
+def magma_ctr_keystream_batch(key, iv, n_blocks, first_block=0, sbox=DEFAULT_SBOX):
+    # Гамма режима гаммирования для блоков first_block .. first_block + n_blocks - 1:
+    # E(CTR_1 + i), счётчик по модулю 2^64 (переполнение uint64)
+    round_keys = round_keys_array(key)
+    tables = tables_array(sbox)
+    start = np.uint64((ctr_initial_counter(iv) + first_block) & MASK_64)
+    keystream = np.empty(n_blocks, dtype=np.uint64)
+    for i in range(0, n_blocks, BATCH_BLOCKS):
+        count = min(BATCH_BLOCKS, n_blocks - i)
+        counters = start + np.arange(i, i + count, dtype=np.uint64)
+        keystream[i:i + count] = crypt_blocks(counters, round_keys, tables)
+    return blocks_to_bytes(keystream)
+
+
+def magma_encrypt_ctr_batch(data, key, iv, offset=0, sbox=DEFAULT_SBOX):
+    # Гаммирование данных произвольной длины начиная с байта offset потока
+    first_block, skip = divmod(offset, BLOCK_SIZE)
+    n_blocks = -(-(skip + len(data)) // BLOCK_SIZE)
+    keystream = np.frombuffer(magma_ctr_keystream_batch(key, iv, n_blocks, first_block, sbox), dtype=np.uint8)
+    out = np.frombuffer(bytes(data), dtype=np.uint8) ^ keystream[skip:skip + len(data)]
+    return out.tobytes()
+
+
+def magma_decrypt_ctr_batch(data, key, iv, offset=0, sbox=DEFAULT_SBOX):
+    return magma_encrypt_ctr_batch(data, key, iv, offset, sbox)
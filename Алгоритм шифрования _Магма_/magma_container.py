@@ -0,0 +1,142 @@
+# Двоичный контейнер для шифртекста Магмы.
+#
+# Заголовок (24 байта, big-endian):
+#   MAGIC (4 байта) | версия (1) | режим (1) | номер набора S-box (1) | резерв (1) |
+#   IV (8 байт) | длина открытого текста (8 байт)
+# За заголовком идут блоки шифртекста по 8 байт. Последний блок дополняется
+# нулями, лишние байты отбрасываются по длине из заголовка.
+#
+# Запись и чтение идут частями, поэтому файл целиком в памяти не держится.
+
+from struct import Struct
+
+from magma import MagmaCipher, BLOCK_SIZE, DEFAULT_SBOX, SBOX_IDS, iv_block, sbox_name
+
+MAGIC = b'MGMA'
+VERSION = 1
+HEADER = Struct('>4sBBBx8sQ')
+LENGTH_OFFSET = HEADER.size - 8  # Смещение поля длины (дописывается при закрытии)
+
+MODE_CBC = 1
+
+CHUNK_SIZE = 1 << 20  # Размер части, читаемой за один раз (1 МБ, кратен 8)
+
+
+class MagmaWriter:
+    """
+    Потоковая запись шифртекста в контейнер.
+
+    write() шифрует полные блоки сразу, хвост короче 8 байт ждёт следующего
+    вызова. Если длина заранее не известна, файл должен поддерживать seek:
+    длина записывается в заголовок при close(). Набор S-box (sbox) - имя
+    из реестра magma; в заголовок пишется его номер.
+    """
+
+    def __init__(self, file, key, iv, length=None, mode=MODE_CBC, sbox=DEFAULT_SBOX):
+        if mode != MODE_CBC:
+            raise ValueError(f"Неизвестный режим: {mode}")
+        if length is None and not file.seekable():
+            raise ValueError("Для файла без seek длину нужно указать заранее")
+        self.file = file
+        self.cipher = MagmaCipher(key, sbox)
+        self.iv = iv_block(iv).to_bytes(BLOCK_SIZE, 'big')  # Проверяется до записи заголовка
+        self.vector = self.iv
+        self.length = length
+        self.written = 0
+        self.pending = bytearray()
+        self.start = file.tell() if file.seekable() else 0
+        file.write(HEADER.pack(MAGIC, VERSION, mode, SBOX_IDS[sbox], self.iv, length or 0))
+
+    def write(self, data):
+        self.pending += data
+        self.written += len(data)
+        full_length = len(self.pending) // BLOCK_SIZE * BLOCK_SIZE
+        if full_length:
+            out = bytearray(full_length)
+            with memoryview(self.pending) as view:  # Без копирования; освобождаем до изменения размера
+                self.cipher.encrypt_cbc_into(view[:full_length], self.vector, out)
+            self.vector = bytes(out[-BLOCK_SIZE:])
+            self.file.write(out)
+            del self.pending[:full_length]
+
+    def close(self):
+        # Дописывает последний неполный блок и длину; сам файл не закрывается
+        if self.pending:
+            tail = bytes(self.pending) + bytes(BLOCK_SIZE - len(self.pending))
+            out = bytearray(BLOCK_SIZE)
+            self.cipher.encrypt_cbc_into(tail, self.vector, out)
+            self.vector = bytes(out)
+            self.file.write(out)
+            self.pending = bytearray()
+        if self.length is None:
+            end = self.file.tell()
+            self.file.seek(self.start + LENGTH_OFFSET)
+            self.file.write(self.written.to_bytes(8, 'big'))
+            self.file.seek(end)
+        elif self.length != self.written:
+            raise ValueError("Записано не столько байт, сколько указано в заголовке")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if exc[0] is None:
+            self.close()
+
+
+class MagmaReader:
+    """
+    Потоковое чтение контейнера: заголовок разбирается в конструкторе,
+    chunks() отдаёт открытый текст частями. Набор S-box находится в реестре
+    magma по номеру из заголовка; свой набор нужно заранее зарегистрировать
+    под тем же номером, что и при записи.
+    """
+
+    def __init__(self, file, key):
+        header = file.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError("Файл короче заголовка контейнера")
+        magic, version, self.mode, self.param_set, self.iv, self.length = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Это не контейнер Магмы или версия не поддерживается")
+        if self.mode != MODE_CBC:
+            raise ValueError(f"Неизвестный режим: {self.mode}")
+        self.file = file
+        self.sbox = sbox_name(self.param_set)
+        self.cipher = MagmaCipher(key, self.sbox)
+
+    def chunks(self, chunk_size=CHUNK_SIZE):
+        # Части читаются целыми блоками: chunk_size округляется вниз до кратного 8
+        if chunk_size < BLOCK_SIZE:
+            raise ValueError("Размер части должен быть не меньше 8 байт")
+        chunk_size -= chunk_size % BLOCK_SIZE
+        vector = self.iv
+        remaining = self.length
+        while remaining > 0:
+            data = self.file.read(min(chunk_size, -(-remaining // BLOCK_SIZE) * BLOCK_SIZE))
+            if not data or len(data) % BLOCK_SIZE:
+                raise ValueError("Контейнер обрезан")
+            out = bytearray(len(data))
+            self.cipher.decrypt_cbc_into(data, vector, out)
+            vector = data[-BLOCK_SIZE:]
+            plaintext = bytes(out[:remaining])
+            remaining -= len(plaintext)
+            yield plaintext
+
+    def read(self):
+        return b''.join(self.chunks())
+
+
+def encrypt_file(source_path, destination_path, key, iv, chunk_size=CHUNK_SIZE, sbox=DEFAULT_SBOX):
+    with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+        with MagmaWriter(destination, key, iv, sbox=sbox) as writer:
+            while True:
+                chunk = source.read(chunk_size)
+                if not chunk:
+                    break
+                writer.write(chunk)
+
+def decrypt_file(source_path, destination_path, key, chunk_size=CHUNK_SIZE):
+    with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+        for chunk in MagmaReader(source, key).chunks(chunk_size):
+            destination.write(chunk)
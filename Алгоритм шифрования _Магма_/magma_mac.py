@@ -0,0 +1,144 @@
+# Имитовставка Магмы (режим выработки имитовставки, ГОСТ Р 34.13-2015, п. 5.6).
+# Подключи K1 и K2 вычисляются один раз на ключ, ключи раундов берутся
+# из общего LRU-кэша (get_cipher).
+
+from hmac import compare_digest
+from struct import unpack_from
+
+from magma import BLOCK_SIZE, DEFAULT_SBOX, MASK_64, crypt_block, get_cipher
+
+MAC_SIZE = 4  # Длина имитовставки по умолчанию в байтах (32 бита, как в примере ГОСТ)
+
+
+def shift_subkey(value):
+    # Сдвиг влево на 1 бит; если старший бит был единицей - XOR с B = 0x1B
+    value <<= 1
+    if value >> 64:
+        value = (value & MASK_64) ^ 0x1B
+    return value
+
+def mac_subkeys(cipher):
+    # K1 и K2 из R = E_K(0^64)
+    k1 = shift_subkey(cipher.encrypt_block(0))
+    return k1, shift_subkey(k1)
+
+
+class MagmaMAC:
+    """
+    Инкрементальная имитовставка Магмы.
+
+    update() поглощает полные блоки прямо из переданного буфера (через
+    unpack_from по смещению), копируется только хвост до 8 байт, который
+    может оказаться последним блоком сообщения.
+    """
+
+    def __init__(self, key, mac_size=MAC_SIZE, sbox=DEFAULT_SBOX):
+        if not 1 <= mac_size <= BLOCK_SIZE:
+            raise ValueError("Длина имитовставки - от 1 до 8 байт")
+        self.cipher = get_cipher(key, sbox)
+        self.k1, self.k2 = mac_subkeys(self.cipher)
+        self.mac_size = mac_size
+        self.state = 0
+        self.pending = b''
+
+    def copy(self):
+        other = MagmaMAC.__new__(MagmaMAC)
+        other.cipher, other.k1, other.k2, other.mac_size = self.cipher, self.k1, self.k2, self.mac_size
+        other.state, other.pending = self.state, self.pending
+        return other
+
+    def update(self, data):
+        keys, tables = self.cipher.encrypt_keys, self.cipher.tables
+        state = self.state
+        length = len(data)
+        position = 0
+
+        if self.pending:  # Сначала дополняем хвост предыдущего вызова
+            if len(self.pending) < BLOCK_SIZE:
+                position = min(BLOCK_SIZE - len(self.pending), length)
+                self.pending += bytes(data[:position])
+            if len(self.pending) == BLOCK_SIZE and position < length:
+                state = crypt_block(state ^ int.from_bytes(self.pending, 'big'), keys, tables)
+                self.pending = b''
+
+        # Полные блоки, кроме последнего (он может оказаться финальным)
+        while length - position > BLOCK_SIZE:
+            state = crypt_block(state ^ unpack_from('>Q', data, position)[0], keys, tables)
+            position += BLOCK_SIZE
+
+        if position < length:
+            self.pending = bytes(data[position:])
+        self.state = state
+        return self
+
+    def digest(self):
+        # Не меняет состояние, поэтому update() можно продолжать после digest()
+        if len(self.pending) == BLOCK_SIZE:
+            last = int.from_bytes(self.pending, 'big') ^ self.k1
+        else:
+            padded = self.pending + b'\x80' + bytes(BLOCK_SIZE - 1 - len(self.pending))
+            last = int.from_bytes(padded, 'big') ^ self.k2
+        result = self.cipher.encrypt_block(self.state ^ last)
+        return result.to_bytes(BLOCK_SIZE, 'big')[:self.mac_size]  # Старшие биты
+
+    def hexdigest(self):
+        return self.digest().hex()
+
+    def verify(self, mac):
+        # Сравнение за постоянное время; имитовставка другой длины отвергается сразу
+        if len(mac) != self.mac_size:
+            raise ValueError("Неверная длина имитовставки")
+        if not compare_digest(self.digest(), bytes(mac)):
+            raise ValueError("Имитовставка не совпадает")
+
+
+def magma_mac(message, key, mac_size=MAC_SIZE, sbox=DEFAULT_SBOX):
+    return MagmaMAC(key, mac_size, sbox).update(message).digest()
+
+
+class CTRMACStream:
+    """
+    Гаммирование и имитовставка за один проход по данным.
+
+    Каждая часть, переданная в update(), сразу гаммируется и поглощается
+    имитовставкой, пока она в кэше. Имитовставка считается от шифртекста
+    (сначала шифрование, потом имитовставка), ключи шифрования и
+    имитовставки должны быть разными. При расшифровании результат update()
+    нельзя использовать, пока verify() не прошла.
+    """
+
+    def __init__(self, key, mac_key, iv, encrypting=True, mac_size=MAC_SIZE, sbox=DEFAULT_SBOX):
+        self.cipher = get_cipher(key, sbox)
+        self.mac = MagmaMAC(mac_key, mac_size, sbox)
+        self.iv = iv
+        self.encrypting = encrypting
+        self.offset = 0
+
+    def update(self, data):
+        out = bytearray(len(data))
+        self.cipher.ctr_xor_into(data, self.iv, out, self.offset)
+        self.offset += len(data)
+        self.mac.update(out if self.encrypting else data)
+        return bytes(out)
+
+    def digest(self):
+        return self.mac.digest()
+
+    def verify(self, mac):
+        self.mac.verify(mac)
+
+
+def magma_encrypt_ctr_mac(plaintext, key, mac_key, iv, mac_size=MAC_SIZE, sbox=DEFAULT_SBOX):
+    # Возвращает (шифртекст, имитовставка)
+    stream = CTRMACStream(key, mac_key, iv, True, mac_size, sbox)
+    return stream.update(plaintext), stream.digest()
+
+def magma_decrypt_ctr_mac(ciphertext, key, mac_key, iv, mac, mac_size=MAC_SIZE, sbox=DEFAULT_SBOX):
+    # Расшифровывает и проверяет имитовставку; при несовпадении - ValueError.
+    # Длину имитовставки задаёт получатель, а не длина переданного mac
+    if len(mac) != mac_size:
+        raise ValueError("Неверная длина имитовставки")
+    stream = CTRMACStream(key, mac_key, iv, False, mac_size, sbox)
+    plaintext = stream.update(ciphertext)
+    stream.verify(mac)
+    return plaintext